@@ -0,0 +1,89 @@
+"""
+Benchmark: keyword automaton vs. the original substring loop.
+
+Compares `mock_data.analyze_content_keywords` (one `kw in text` scan per
+keyword) with `keywords.analyze_content_keywords` (one Aho-Corasick pass) as
+the keyword count and the body size grow.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_keywords
+    python -m benchmarks.bench_keywords --keywords 14 1000 10000 --body-kb 1 100 1000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from email_classifier import mock_data
+from email_classifier import keywords as kw_engine
+
+
+def make_keywords(n: int, seed: int = 0) -> list[str]:
+    """Return SPAM_KEYWORDS padded with random 1-3 word phrases up to n entries."""
+    rng = random.Random(seed)
+    result = list(mock_data.SPAM_KEYWORDS[:n])
+    while len(result) < n:
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        result.append(" ".join(words))
+    return result
+
+
+def make_body(size_kb: int, seed: int = 0) -> str:
+    """Return roughly size_kb KiB of newsletter-like text built from MOCK_EMAILS."""
+    rng = random.Random(seed)
+    sentences = []
+    for email in mock_data.MOCK_EMAILS:
+        sentences.extend(s.strip() for s in email["body"].split(".") if s.strip())
+    parts, size = [], 0
+    while size < size_kb * 1024:
+        sentence = rng.choice(sentences) + ". "
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)
+
+
+def time_call(fn, repeat: int) -> float:
+    """Best wall-clock time of `repeat` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(keyword_counts: list[int], body_sizes_kb: list[int], repeat: int) -> None:
+    original = mock_data.SPAM_KEYWORDS
+    subject = mock_data.MOCK_EMAILS[2]["subject"]
+    print(f"{'keywords':>9s} {'body_kb':>8s} {'loop_ms':>10s} {'automaton_ms':>13s} {'speedup':>8s}")
+    try:
+        for n in keyword_counts:
+            mock_data.SPAM_KEYWORDS = make_keywords(n)
+            kw_engine.get_automaton()  # build outside the timed region
+            for size_kb in body_sizes_kb:
+                body = make_body(size_kb)
+                expected = mock_data.analyze_content_keywords(subject, body)
+                assert kw_engine.analyze_content_keywords(subject, body) == expected
+                loop_ms = time_call(lambda: mock_data.analyze_content_keywords(subject, body), repeat)
+                auto_ms = time_call(lambda: kw_engine.analyze_content_keywords(subject, body), repeat)
+                print(f"{n:>9d} {size_kb:>8d} {loop_ms:>10.2f} {auto_ms:>13.2f} {loop_ms / auto_ms:>7.1f}x")
+    finally:
+        mock_data.SPAM_KEYWORDS = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--keywords", type=int, nargs="+", default=[14, 100, 1000, 10000])
+    parser.add_argument("--body-kb", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.keywords, args.body_kb, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: worker cold start.
+
+Each scenario runs in a fresh interpreter and measures the time from the
+first import to the first classified email:
+
+  - eager:  import pipeline, build_pipeline(), graph.invoke(email)
+  - worker: import worker, warm_up(), worker.classify(email)
+            (also reports when the background warm-up is done)
+
+followed by an import-time profile (`python -X importtime`) of the modules
+each path imports before its first email, grouped by top-level package.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --top 8
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+
+SCENARIOS = {
+    "eager": """
+from email_classifier.pipeline import build_pipeline
+graph = build_pipeline()
+graph.invoke(EMAIL)
+first = time.perf_counter() - start
+warm = first
+""",
+    "worker": """
+from email_classifier import worker
+thread = worker.warm_up()
+worker.classify(EMAIL)
+first = time.perf_counter() - start
+thread.join()
+warm = time.perf_counter() - start
+""",
+}
+
+PRELUDE = """
+import json, time
+start = time.perf_counter()
+EMAIL = {"email_id": "cold", "subject": "Team meeting", "body": "See you at 2 PM.",
+         "sender": "alice@company.com", "urls": [], "has_attachments": False}
+"""
+
+# What each path imports before its first email.
+PROFILED_IMPORTS = {
+    "eager": "import email_classifier.pipeline",
+    "worker": "import email_classifier.worker, email_classifier.batch",
+}
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True, env=env
+    )
+
+
+def time_scenario(name: str, runs: int) -> dict:
+    code = PRELUDE + SCENARIOS[name] + "print(json.dumps({'first': first, 'warm': warm}))"
+    samples = [json.loads(_run(code).stdout) for _ in range(runs)]
+    return {
+        "first_email_ms": statistics.median(s["first"] for s in samples) * 1000,
+        "warm_ms": statistics.median(s["warm"] for s in samples) * 1000,
+    }
+
+
+def import_profile(statement: str) -> dict[str, float]:
+    """Self import time (ms) per top-level package, from -X importtime."""
+    stderr = _run(statement, "-X", "importtime").stderr
+    by_package: dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        by_package[name.strip().split(".")[0]] += int(self_us) / 1000
+    return dict(by_package)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=6, help="packages shown per import profile")
+    args = parser.parse_args()
+
+    print(f"{'scenario':>10s} {'first_email_ms':>15s} {'graph_ready_ms':>15s}")
+    for name in SCENARIOS:
+        r = time_scenario(name, args.runs)
+        print(f"{name:>10s} {r['first_email_ms']:>15.1f} {r['warm_ms']:>15.1f}")
+
+    for name, statement in PROFILED_IMPORTS.items():
+        profile = import_profile(statement)
+        print(f"\nimport profile ({name}): {sum(profile.values()):.1f} ms  [{statement}]")
+        for package, ms in sorted(profile.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {package:<24s} {ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: EmailState (Pydantic) vs. LeanEmailState (slots + body refs).
+
+For each schema, measures:
+  - latency of one `graph.invoke` on the classifier graph (median, ms)
+  - peak memory allocated while classifying one email (tracemalloc, KiB)
+  - bytes stored by the HITL checkpointer per suspicious email
+
+Run from the repository root:
+
+    python -m benchmarks.bench_state
+    python -m benchmarks.bench_state --emails 200 --body-kb 256
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from email_classifier.mock_data import MOCK_EMAILS
+from email_classifier.pipeline import build_pipeline
+from email_classifier.state import EmailState
+from email_classifier.lean_state import LeanEmailState, lean_input
+
+
+def make_emails(n: int, body_kb: int) -> list[dict]:
+    """n copies of the MOCK_EMAILS templates with bodies padded to body_kb KiB."""
+    emails = []
+    for i in range(n):
+        template = MOCK_EMAILS[i % len(MOCK_EMAILS)]
+        body = template["body"]
+        body = (body + "\n") * max(1, body_kb * 1024 // len(body))
+        emails.append(dict(template, email_id=f"bench_{i}", body=body))
+    return emails
+
+
+def checkpoint_bytes(saver) -> int:
+    """Total size of the serialized checkpoints held by an InMemorySaver."""
+    size = sum(len(blob) for _, blob in saver.blobs.values())
+    for namespaces in saver.storage.values():
+        for checkpoints in namespaces.values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                size += len(checkpoint[1]) + len(metadata[1])
+    return size
+
+
+def bench(schema, emails: list[dict]) -> dict:
+    # One input per invoke: a lean input's body reference is released when
+    # its run completes.
+    prepare = lean_input if schema is LeanEmailState else dict
+
+    graph = build_pipeline(state_schema=schema)
+    graph.invoke(prepare(emails[0]))  # warm-up
+
+    latencies, peaks = [], []
+    for email in map(prepare, emails):
+        tracemalloc.start()
+        start = time.perf_counter()
+        graph.invoke(email)
+        latencies.append(time.perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    hitl = build_pipeline(hitl=True, state_schema=schema)
+    suspicious = [prepare(e) for e in emails if e["subject"].startswith("URGENT: Invoice")]
+    for i, email in enumerate(suspicious):
+        hitl.invoke(email, {"configurable": {"thread_id": f"bench-{i}"}})
+
+    return {
+        "latency_ms": statistics.median(latencies) * 1000,
+        "peak_kib": statistics.median(peaks) / 1024,
+        "checkpoint_kib": checkpoint_bytes(hitl.checkpointer) / len(suspicious) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=100)
+    parser.add_argument("--body-kb", type=int, nargs="+", default=[1, 64, 512])
+    args = parser.parse_args()
+
+    print(f"{'schema':>15s} {'body_kb':>8s} {'latency_ms':>11s} {'peak_kib':>10s} {'ckpt_kib/email':>15s}")
+    for body_kb in args.body_kb:
+        emails = make_emails(args.emails, body_kb)
+        for schema in (EmailState, LeanEmailState):
+            r = bench(schema, emails)
+            print(
+                f"{schema.__name__:>15s} {body_kb:>8d} {r['latency_ms']:>11.2f} "
+                f"{r['peak_kib']:>10.1f} {r['checkpoint_kib']:>15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
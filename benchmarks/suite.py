@@ -0,0 +1,190 @@
+"""
+Reproducible benchmark suite.
+
+Times, on synthetic corpora from benchmarks/corpus.py:
+
+  check_urls       -- check_urls_against_blocklist, one call per email
+  analyze_content  -- analyze_content_keywords, one call per email
+  invoke           -- full classifier graph.invoke, one call per email
+  classify_batch   -- batch.classify_batch, 10k-email chunks
+  hitl_cycle       -- HITL graph.invoke per email; threads that pause at
+                      human_review are resumed (update_state + invoke(None))
+
+at each requested corpus size, and writes one JSON document with the
+environment, the corpus profile and one record per (benchmark, size).
+
+Run from the repository root:
+
+    python -m benchmarks.suite                                   # 1k emails
+    python -m benchmarks.suite --sizes 1000 100000 1000000 --output bench.json
+    python -m benchmarks.suite --only check_urls analyze_content --blocklist-hit-rate 0.01
+
+Emails are generated and processed in chunks of 10k; only the processing
+is timed. Graph benchmarks at 1M emails take a long time; `--time-budget`
+stops a benchmark once that many seconds have been spent and reports the
+throughput measured on the emails processed so far (`processed` < `size`
+in the record).
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from itertools import islice
+
+from benchmarks.corpus import CorpusProfile, generate_corpus
+from email_classifier.blocklist import check_urls_against_blocklist
+from email_classifier.keywords import analyze_content_keywords
+from email_classifier.batch import classify_batch
+from email_classifier.pipeline import build_pipeline
+
+
+CHUNK = 10_000
+PROFILE_OVERRIDES = ("body_median_chars", "body_sigma", "urls_mean", "blocklist_hit_rate", "keywords_mean", "attachment_rate")
+
+
+# Each benchmark is a factory: setup work (building graphs) happens outside
+# the timed region, and the returned function processes one chunk of emails.
+
+def bench_check_urls():
+    def run(emails):
+        for email in emails:
+            check_urls_against_blocklist(email["urls"])
+    return run
+
+
+def bench_analyze_content():
+    def run(emails):
+        for email in emails:
+            analyze_content_keywords(email["subject"], email["body"])
+    return run
+
+
+def bench_invoke():
+    graph = build_pipeline()
+
+    def run(emails):
+        for email in emails:
+            graph.invoke(email)
+    return run
+
+
+def bench_classify_batch():
+    def run(emails):
+        classify_batch(emails)
+    return run
+
+
+def bench_hitl_cycle():
+    graph = build_pipeline(hitl=True)
+
+    def run(emails):
+        for email in emails:
+            config = {"configurable": {"thread_id": email["email_id"]}}
+            graph.invoke(email, config)
+            if graph.get_state(config).next:
+                graph.update_state(config, {"threat_level": "safe"})
+                graph.invoke(None, config)
+    return run
+
+
+BENCHMARKS = {
+    "check_urls": bench_check_urls,
+    "analyze_content": bench_analyze_content,
+    "invoke": bench_invoke,
+    "classify_batch": bench_classify_batch,
+    "hitl_cycle": bench_hitl_cycle,
+}
+
+
+def time_benchmark(name, size, profile, seed, time_budget=None) -> dict:
+    """Run one benchmark over a `size`-email corpus, in chunks.
+
+    Corpus generation is not timed. With `time_budget` (seconds), stops
+    after the first chunk that exceeds it.
+    """
+    run = BENCHMARKS[name]()
+    corpus = generate_corpus(size, profile=profile, seed=seed)
+    processed, elapsed = 0, 0.0
+    while chunk := list(islice(corpus, CHUNK)):
+        start = time.perf_counter()
+        run(chunk)
+        elapsed += time.perf_counter() - start
+        processed += len(chunk)
+        if time_budget is not None and elapsed > time_budget:
+            break
+    return {
+        "benchmark": name,
+        "size": size,
+        "processed": processed,
+        "seconds": round(elapsed, 6),
+        "emails_per_second": round(processed / elapsed, 2) if elapsed else None,
+        "us_per_email": round(elapsed / processed * 1e6, 3) if processed else None,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, names, profile, seed, time_budget) -> dict:
+    records = []
+    for size in sizes:
+        for name in names:
+            record = time_benchmark(name, size, profile, seed, time_budget)
+            records.append(record)
+            print(
+                f"{name:>16s} {size:>9d} {record['processed']:>9d} {record['seconds']:>9.3f}s "
+                f"{record['emails_per_second']:>12} emails/s",
+                file=sys.stderr,
+            )
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "git_revision": _git_revision(),
+        },
+        "seed": seed,
+        "profile": profile.__dict__,
+        "results": records,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-budget", type=float, default=None, help="seconds per benchmark")
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    for field in PROFILE_OVERRIDES:
+        parser.add_argument("--" + field.replace("_", "-"), type=float, default=None)
+    args = parser.parse_args()
+
+    profile = CorpusProfile.from_templates()
+    overrides = {
+        field: getattr(args, field)
+        for field in PROFILE_OVERRIDES
+        if getattr(args, field) is not None
+    }
+    profile = profile.replace(**overrides)
+
+    report = run(args.sizes, args.only, profile, args.seed, args.time_budget)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
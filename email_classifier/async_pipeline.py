@@ -0,0 +1,132 @@
+"""
+Async streaming classifier
+==========================
+
+Drive a compiled graph (from `build_email_classifier()` or
+`build_hitl_graph()`) over an async stream of emails with `ainvoke`.
+
+  - At most `concurrency` emails are in flight at any time.
+  - Backpressure: the source is only read when a slot is free, so a fast
+    producer (mail spool, queue) never piles up unbounded work.
+  - Results are yielded as soon as they finish, not in input order.
+
+All in-flight emails share one event loop. Once the URL check or content
+analysis become async I/O lookups, a single worker can keep thousands of
+emails in flight without a thread per email.
+
+Usage:
+
+    from email_classifier.async_pipeline import classify_stream
+
+    async for email, result in classify_stream(graph, emails, concurrency=500):
+        ...
+
+    # HITL graph: one thread per email
+    async for email, result in classify_stream(
+        hitl_graph, emails, config=lambda e: {"configurable": {"thread_id": e["email_id"]}}
+    ):
+        ...
+"""
+
+import asyncio
+
+
+DEFAULT_CONCURRENCY = 100
+
+# Marks the end of a queue fed to iter_queue.
+QUEUE_DONE = object()
+
+
+async def _aiter(emails):
+    """Accept both async and plain iterables."""
+    if hasattr(emails, "__aiter__"):
+        async for email in emails:
+            yield email
+    else:
+        for email in emails:
+            yield email
+
+
+async def classify_stream(
+    graph,
+    emails,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    config=None,
+    return_exceptions: bool = False,
+):
+    """Classify a stream of emails with bounded concurrency.
+
+    Args:
+        graph: A compiled graph (anything with an `ainvoke` method).
+        emails: An async iterator (or plain iterable) of email dicts.
+        concurrency: Maximum number of emails in flight.
+        config: Optional callable `email -> config` passed to `ainvoke`
+                (e.g. to give each email its own HITL thread_id).
+        return_exceptions: If True, a failing email yields its exception as
+                the result instead of stopping the stream.
+
+    Yields:
+        (email, result) tuples, in completion order.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+
+    pending: dict[asyncio.Task, dict] = {}
+    source = _aiter(emails)
+    exhausted = False
+    # Read of the next email, raced against the in-flight emails so that a
+    # slow source never holds back results that are already done.
+    fetch = None
+
+    try:
+        while True:
+            # Read the source only while a slot is free (backpressure: never read ahead).
+            if fetch is None and not exhausted and len(pending) < concurrency:
+                fetch = asyncio.ensure_future(source.__anext__())
+
+            if fetch is None and not pending:
+                return
+
+            waiting = set(pending)
+            if fetch is not None:
+                waiting.add(fetch)
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+            if fetch in done:
+                done.discard(fetch)
+                try:
+                    email = fetch.result()
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    cfg = config(email) if config else None
+                    task = asyncio.ensure_future(graph.ainvoke(email, cfg))
+                    pending[task] = email
+                fetch = None
+
+            for task in done:
+                email = pending.pop(task)
+                if task.exception() is not None and not return_exceptions:
+                    raise task.exception()
+                yield email, task.exception() or task.result()
+    finally:
+        tasks = list(pending)
+        if fetch is not None:
+            tasks.append(fetch)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await source.aclose()
+
+
+async def iter_queue(queue: asyncio.Queue):
+    """Turn an asyncio.Queue into an async iterator of emails.
+
+    The producer puts QUEUE_DONE on the queue to end the stream.
+    """
+    while True:
+        email = await queue.get()
+        if email is QUEUE_DONE:
+            return
+        yield email
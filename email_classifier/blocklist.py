@@ -0,0 +1,222 @@
+"""
+Indexed URL blocklist.
+
+`mock_data.check_urls_against_blocklist` builds a joined string for every
+parent-domain candidate of every URL ("a.b.evil.com", "b.evil.com",
+"evil.com") and tests each one against URL_BLOCKLIST. This module stores the
+blocklist as a trie keyed on *reversed* domain labels:
+
+    com ── malware-site (blocked)
+     └──── fake-bank-login (blocked)
+    net ── phishing-page (blocked)
+
+so "is this host or any parent blocked" becomes a single walk from the TLD
+down, with no intermediate strings.
+
+The index can be saved to / loaded from a compact text file holding one
+reversed domain per line ("com.malware-site"), sorted so that neighbouring
+lines share prefixes. Files ending in ".gz" are gzip-compressed.
+
+Usage:
+
+    from email_classifier.blocklist import BlocklistIndex, check_urls_against_blocklist
+    result = check_urls_against_blocklist(urls)       # same dict as mock_data
+
+    index = BlocklistIndex.load("blocklist.txt.gz")   # production-sized list
+    result = index.check_urls(urls)
+"""
+
+import gzip
+import re
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+from email_classifier import mock_data
+from email_classifier.urls import normalize_host
+
+
+# Key marking "a blocklisted domain ends at this node" (labels are never None).
+_BLOCKED = None
+
+_SCHEME = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*://")
+
+
+def extract_host(url: str) -> str:
+    """Extract the normalized host of a URL (see `urls.normalize_host`).
+
+    The host comes from the authority only: unlike the original checker's
+    `url.split("//")[-1]`, a "//" later in the path or query
+    ("https://evil.com/go?next=https://good.com/") does not move it.
+    Userinfo and port are dropped; a URL without a scheme ("evil.com/a")
+    starts with its authority.
+    """
+    if not _SCHEME.match(url):
+        url = "//" + url
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:  # e.g. an unterminated IPv6 literal
+        return ""
+    return normalize_host(host) if host else ""
+
+
+class BlocklistIndex:
+    """Trie of blocklisted domains keyed on reversed labels."""
+
+    def __init__(self, domains=()):
+        self._root: dict = {}
+        self._size = 0
+        for domain in domains:
+            self.add(domain)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, domain: str) -> bool:
+        """Exact membership (no parent-domain matching)."""
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+        return _BLOCKED in node
+
+    def add(self, domain: str) -> None:
+        """Add one domain (e.g. "malware-site.com") to the index."""
+        node = self._root
+        for label in reversed(domain.split(".")):
+            child = node.get(label)
+            if child is None:
+                child = node[label] = {}
+            node = child
+        if _BLOCKED not in node:
+            node[_BLOCKED] = True
+            self._size += 1
+
+    def domains(self):
+        """Yield every blocklisted domain, in sorted reversed-label order."""
+        stack = [(self._root, [])]
+        while stack:
+            node, labels = stack.pop()
+            if _BLOCKED in node:
+                yield ".".join(reversed(labels))
+            for label in sorted((k for k in node if k is not _BLOCKED), reverse=True):
+                stack.append((node[label], labels + [label]))
+
+    # ---------- Lookups ----------
+
+    def is_blocked(self, host: str) -> bool:
+        """True if `host` or any of its parent domains is blocklisted.
+
+        Like the original checker, only candidates with at least two labels
+        are considered: "evil.com" can match, a bare "com" entry never does.
+        """
+        node = self._root
+        depth = 0
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            depth += 1
+            if depth >= 2 and _BLOCKED in node:
+                return True
+        return False
+
+    def check_urls(self, urls: list[str]) -> dict:
+        """Check a list of URLs against the index.
+
+        Returns the same dict as `mock_data.check_urls_against_blocklist`.
+        """
+        is_blocked = self.is_blocked
+        flagged = [url for url in urls if is_blocked(extract_host(url))]
+        return {
+            "safe": len(flagged) == 0,
+            "flagged_urls": flagged,
+            "checked_count": len(urls),
+        }
+
+    # ---------- On-disk format ----------
+
+    def save(self, path: str) -> None:
+        """Write the index as sorted reversed domains, one per line."""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            for domain in self.domains():
+                f.write(".".join(reversed(domain.split("."))))
+                f.write("\n")
+
+    @classmethod
+    def load(cls, path: str) -> "BlocklistIndex":
+        """Load an index written by `save` (or any reversed-domain list)."""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return cls.from_reversed(line.rstrip("\n") for line in f)
+
+    @classmethod
+    def from_reversed(cls, lines) -> "BlocklistIndex":
+        """Build an index from reversed domains ("com.malware-site")."""
+        index = cls()
+        for line in lines:
+            if line:
+                index.add(".".join(reversed(line.split("."))))
+        return index
+
+
+# ---------- Cache (one index per URL_BLOCKLIST generation) ----------
+
+# Bumped by invalidate_index(); the cached index is reused while both the
+# domain collection (by identity) and the generation are unchanged.
+_generation = 0
+_cached_generation = -1
+_cached_domains = None
+_cached_index = None
+
+# Index pinned for the current context by rules.use_rules (None: URL_BLOCKLIST).
+_active_index: ContextVar = ContextVar("active_index", default=None)
+
+
+def get_index(domains=None) -> BlocklistIndex:
+    """Return the index for `domains` (default: the pinned rule set, or
+    URL_BLOCKLIST).
+
+    The index is rebuilt only when a different domain collection is passed
+    (or URL_BLOCKLIST is rebound) or after `invalidate_index()`, so a call
+    costs O(1) whatever the size of the blocklist. Changing URL_BLOCKLIST in
+    place is not detected: call `invalidate_index()` afterwards.
+    """
+    global _cached_generation, _cached_domains, _cached_index
+
+    if domains is None:
+        active = _active_index.get()
+        if active is not None:
+            return active
+        domains = mock_data.URL_BLOCKLIST
+    if domains is not _cached_domains or _cached_generation != _generation:
+        _cached_index = BlocklistIndex(domains)
+        _cached_domains = domains
+        _cached_generation = _generation
+    return _cached_index
+
+
+def invalidate_index() -> None:
+    """Rebuild the cached index on the next `get_index()` call (after
+    URL_BLOCKLIST, or a domain set passed to get_index, changed in place)."""
+    global _generation
+    _generation += 1
+
+
+def check_urls_against_blocklist(urls: list[str], index=None) -> dict:
+    """Drop-in replacement for `mock_data.check_urls_against_blocklist`
+    (hosts are parsed from the URL authority, see `extract_host`).
+
+    Args:
+        urls: List of URL strings to check.
+        index: Index to query (a BlocklistIndex or a
+               mmap_blocklist.MappedBlocklist); default: `get_index()`.
+
+    Returns:
+        dict with keys:
+            - "safe" (bool): True if ALL urls are safe
+            - "flagged_urls" (list[str]): URLs whose domain is in the blocklist
+            - "checked_count" (int): Total URLs checked
+    """
+    return (index if index is not None else get_index()).check_urls(urls)
@@ -0,0 +1,127 @@
+"""
+Parallel URL / content branches
+===============================
+
+In `build_email_classifier()` analyze_content only starts once check_urls
+is done, so per-email latency is the sum of both. The two checks are
+independent: `build_pipeline(parallel=True)` runs them as parallel
+branches of the same step and joins them before generate_response:
+
+    START ──> check_urls ──────┐
+      └────> analyze_content ──┴──> generate_response ──> END
+
+Both branches may write threat_level in the same step. `ParallelEmailState`
+gives that field a reducer implementing the rule of the sequential graph:
+"dangerous" overrides everything.
+
+The content branch is skipped when the URL branch has already found a
+blocklisted URL, and a streaming scan of a large body
+(keywords.analyze_content_stream) stops at its next chunk once that
+happens. A skipped branch writes nothing, so the email ends like in the
+sequential graph: dangerous, with no content_analysis. If the content
+branch finishes first, its content_analysis is kept (threat_level is still
+"dangerous").
+"""
+
+import threading
+from typing import Annotated
+
+from langgraph.runtime import get_runtime
+
+from email_classifier import keywords as keywords_module
+from email_classifier.keywords import ScanCancelled
+from email_classifier.state import EmailState
+
+
+def merge_threat_level(current: str, update: str) -> str:
+    """threat_level reducer: "dangerous" overrides everything, otherwise the
+    latest write wins."""
+    return "dangerous" if "dangerous" in (current, update) else update
+
+
+class ParallelEmailState(EmailState):
+    threat_level: Annotated[str, merge_threat_level] = ""
+
+
+# ---------- Cancellation ----------
+
+class _Cancellations:
+    """One Event per running step, shared by the two branches of an email.
+
+    Both branches run in the same step, so the step's checkpoint id
+    identifies the email's invocation. The entry is dropped when both
+    branches are done.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, list] = {}  # key -> [event, branches left]
+
+    def acquire(self, key: str) -> threading.Event:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [threading.Event(), 2]
+            return entry[0]
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._entries[key]
+
+
+_cancellations = _Cancellations()
+
+
+def _step_key() -> str | None:
+    try:
+        return get_runtime().execution_info.checkpoint_id
+    except (RuntimeError, AttributeError):  # not inside a graph step
+        return None
+
+
+# ---------- Branch wrappers ----------
+
+def url_branch(node):
+    """Wrap check_urls: signal the content branch when a URL is blocklisted."""
+    def url_check(state):
+        key = _step_key()
+        if key is None:
+            return node(state)
+        cancel = _cancellations.acquire(key)
+        try:
+            result = node(state)
+            if result.get("threat_level") == "dangerous":
+                cancel.set()
+            return result
+        finally:
+            _cancellations.release(key)
+
+    url_check.__name__ = getattr(node, "__name__", "check_urls")
+    return url_check
+
+
+def content_branch(node):
+    """Wrap an analyze_content node: skip or abort it once the URL branch
+    has classified the email as dangerous."""
+    def content_check(state):
+        key = _step_key()
+        if key is None:
+            return node(state)
+        cancel = _cancellations.acquire(key)
+        token = keywords_module._cancel_event.set(cancel)
+        try:
+            if cancel.is_set():
+                return {}
+            return node(state)
+        except ScanCancelled:
+            return {}
+        finally:
+            keywords_module._cancel_event.reset(token)
+            _cancellations.release(key)
+
+    content_check.__name__ = getattr(node, "__name__", "analyze_content")
+    return content_check
@@ -0,0 +1,269 @@
+"""
+Content-hash result cache for the graph nodes.
+
+Marketing blasts and phishing campaigns send the same subject / body / URLs
+to thousands of recipients. With the cache enabled, `check_urls` and
+`analyze_content` (see nodes.py) are computed once per distinct content and
+replayed for every copy.
+
+  - Keys are a stable BLAKE2 hash of the normalized fields a node reads
+    (URLs for check_urls, lowercased subject and body for analyze_content).
+    Long bodies are lowercased and hashed chunk by chunk, never copied whole.
+  - Entries are evicted least-recently-used first, when they are older than
+    `ttl` seconds, or when the cache goes over `max_entries` / `max_bytes`.
+  - Entries are stored per rules version (the compiled blocklist index and
+    keyword automaton in use), so results computed against old rules are
+    never returned after URL_BLOCKLIST or SPAM_KEYWORDS change (see
+    blocklist.invalidate_index / keywords.invalidate_automaton). The last
+    `max_rule_versions` versions stay usable side by side, so contexts pinned
+    to different RuleStore versions do not flush each other's entries.
+  - Hit / miss / eviction counters are exposed through `stats()`.
+
+The cache is off by default:
+
+    from email_classifier import cache
+    cache.enable_node_cache(max_bytes=256 * 1024 * 1024, ttl=3600)
+    ...
+    print(cache.node_cache().stats())
+"""
+
+import copy
+import functools
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from email_classifier.blocklist import get_index
+from email_classifier.keywords import get_automaton
+
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_RULE_VERSIONS = 4
+
+# Characters lowercased and encoded at a time when hashing a field.
+KEY_CHUNK_CHARS = 64 * 1024
+
+
+# ---------- Keys ----------
+
+def content_key(namespace: str, subject: str = "", body: str = "", urls=()) -> bytes:
+    """Stable hash of the normalized email content.
+
+    Subject and body are lowercased (the keyword analysis is
+    case-insensitive); URLs are kept as-is and in order (the URL check is
+    case-sensitive and reports flagged URLs in order). Every field is
+    followed by its encoded length so that different splits of the same
+    text never collide.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    _update_field(h, namespace)
+    _update_field(h, subject, lowercase=True)
+    _update_field(h, body, lowercase=True)
+    for url in urls:
+        _update_field(h, url)
+    h.update(len(urls).to_bytes(8, "little"))
+    return h.digest()
+
+
+def _update_field(h, text: str, lowercase: bool = False) -> None:
+    """Hash `text` KEY_CHUNK_CHARS at a time, then its encoded length."""
+    size = 0
+    for start in range(0, len(text), KEY_CHUNK_CHARS):
+        chunk = text[start:start + KEY_CHUNK_CHARS]
+        if lowercase:
+            chunk = chunk.lower()
+        data = chunk.encode("utf-8", "surrogatepass")
+        h.update(data)
+        size += len(data)
+    h.update(size.to_bytes(8, "little"))
+
+
+def _approx_size(obj) -> int:
+    """Rough memory footprint of a node result (dicts, lists, scalars)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_approx_size(v) for v in obj)
+    return size
+
+
+# ---------- Cache ----------
+
+class ResultCache:
+    """Thread-safe LRU cache with optional TTL and a memory budget.
+
+    Args:
+        max_entries: Maximum number of cached results.
+        max_bytes: Approximate memory budget for keys + values.
+        ttl: Seconds after which an entry expires (None: never).
+        max_rule_versions: Rules versions whose entries stay reachable;
+                           entries of older versions are unreachable and
+                           age out of the LRU.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float | None = None,
+        max_rule_versions: int = DEFAULT_MAX_RULE_VERSIONS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_rule_versions = max_rule_versions
+
+        # (rules version, key) -> (value, size, expires)
+        self._entries: OrderedDict[tuple[int, bytes], tuple] = OrderedDict()
+        self._bytes = 0
+        # Recent rules: version -> (index, automaton), most recent last.
+        # Versions are never reused, so entries of a dropped version can
+        # never be hit again.
+        self._rules: OrderedDict[int, tuple] = OrderedDict()
+        self._rule_versions = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _rules_version(self, index, automaton) -> int:
+        """Version number of a blocklist index and keyword automaton pair,
+        assigned the first time it is seen (call with the lock held)."""
+        for version, (known_index, known_automaton) in reversed(self._rules.items()):
+            if known_index is index and known_automaton is automaton:
+                return version
+        if self._rules:
+            self.invalidations += 1
+        self._rule_versions += 1
+        version = self._rule_versions
+        self._rules[version] = (index, automaton)
+        while len(self._rules) > self.max_rule_versions:
+            self._rules.popitem(last=False)
+        return version
+
+    def get(self, key: bytes):
+        """Return a copy of the cached value, or None on a miss."""
+        index, automaton = get_index(), get_automaton()
+        with self._lock:
+            key = (self._rules_version(index, automaton), key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, size, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: bytes, value) -> None:
+        """Store a copy of `value`, evicting old entries to stay in budget."""
+        value = copy.deepcopy(value)
+        size = _approx_size(key) + _approx_size(value)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        index, automaton = get_index(), get_automaton()
+        with self._lock:
+            key = (self._rules_version(index, automaton), key)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Counters for measuring how much traffic is deduplicated."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+# ---------- Node decorator ----------
+
+_node_cache: ResultCache | None = None
+
+
+def enable_node_cache(
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    ttl: float | None = None,
+) -> ResultCache:
+    """Turn on result caching for the memoized nodes and return the cache."""
+    global _node_cache
+    _node_cache = ResultCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+    return _node_cache
+
+
+def disable_node_cache() -> None:
+    """Turn result caching off (the nodes run every time)."""
+    global _node_cache
+    _node_cache = None
+
+
+def node_cache() -> ResultCache | None:
+    """The active node cache, or None when caching is disabled."""
+    return _node_cache
+
+
+def memoize_node(*fields: str):
+    """Cache a node's result by the content of the state `fields` it reads.
+
+    Usage (see nodes.py):
+
+        @memoize_node("subject", "body")
+        def analyze_content(state: EmailState) -> dict:
+            ...
+
+    When caching is disabled the node is called directly.
+    """
+    def decorator(node):
+        namespace = node.__name__
+
+        @functools.wraps(node)
+        def wrapper(state):
+            cache = _node_cache
+            if cache is None:
+                return node(state)
+            key = content_key(namespace, **{name: getattr(state, name) for name in fields})
+            result = cache.get(key)
+            if result is None:
+                result = node(state)
+                cache.put(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,511 @@
+"""
+Persistent checkpointer for the HITL graph.
+
+`InMemorySaver` keeps every paused thread in process RAM: memory grows with
+the review queue and the queue is lost on restart. `SqliteCheckpointSaver`
+stores checkpoints in a local SQLite database (WAL mode) instead:
+
+  - Memory stays flat: only SQLite's bounded page cache lives in RAM.
+  - Writes are batched: they are committed every `batch_size` operations,
+    at most `flush_interval` seconds after the first pending one, or on
+    `flush()` / `close()`, instead of once per checkpoint.
+  - A checkpoint that parks a thread (waiting on one of `interrupt_nodes`,
+    e.g. before human_review) is committed immediately, so a paused thread
+    survives the process ending without `close()`. Pending writes are also
+    committed when the saver is garbage-collected or at interpreter exit.
+  - Lookups by thread_id hit the primary key; a small `threads` table keeps
+    the latest checkpoint and the nodes it is waiting on for every thread.
+  - `compact()` drops the intermediate history of completed threads (or
+    the threads themselves).
+  - A restarted process that opens the same file resumes every thread.
+
+Usage:
+
+    from email_classifier.checkpoint import SqliteCheckpointSaver
+    from email_classifier.hitl import build_hitl_graph
+
+    saver = SqliteCheckpointSaver("reviews.db")
+    hitl_graph = build_hitl_graph(checkpointer=saver)
+"""
+
+import sqlite3
+import threading
+import time
+import weakref
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_CACHE_KB = 8 * 1024
+DEFAULT_INTERRUPT_NODES = ("human_review",)
+
+# LangGraph triggers node X by writing to the channel "branch:to:X".
+_TRIGGER_PREFIX = "branch:to:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_id     TEXT,
+    type          TEXT NOT NULL,
+    checkpoint    BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata      BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel       TEXT NOT NULL,
+    version       TEXT NOT NULL,
+    type          TEXT NOT NULL,
+    value         BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id       TEXT NOT NULL,
+    idx           INTEGER NOT NULL,
+    channel       TEXT NOT NULL,
+    type          TEXT NOT NULL,
+    value         BLOB,
+    task_path     TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+) WITHOUT ROWID;
+
+-- One row per root thread: latest checkpoint and the nodes it waits on
+-- (comma-separated, empty once the run is complete).
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id     TEXT PRIMARY KEY,
+    checkpoint_id TEXT NOT NULL,
+    next_nodes    TEXT NOT NULL,
+    updated_at    REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS threads_by_next ON threads (next_nodes, updated_at);
+"""
+
+
+def _next_nodes(checkpoint: Checkpoint) -> str:
+    """Nodes this checkpoint will run next, as a comma-separated string.
+
+    Same rule LangGraph applies: a node is due when its trigger channel holds
+    a value with a newer version than the one the node last saw.
+    """
+    values = checkpoint["channel_values"]
+    versions = checkpoint["channel_versions"]
+    seen = checkpoint["versions_seen"]
+    nodes = []
+    for channel in values:
+        if channel.startswith(_TRIGGER_PREFIX):
+            node = channel[len(_TRIGGER_PREFIX):]
+        elif channel == "__start__":
+            node = channel
+        else:
+            continue
+        last_seen = seen.get(node, {}).get(channel)
+        if last_seen is None or versions[channel] > last_seen:
+            nodes.append(node)
+    return ",".join(sorted(nodes))
+
+
+def _commit_and_close(conn: sqlite3.Connection, lock) -> None:
+    """Finalizer of SqliteCheckpointSaver (must not reference the saver)."""
+    with lock:
+        if conn.in_transaction:
+            conn.execute("COMMIT")
+        conn.close()
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[int]):
+    """LangGraph checkpointer backed by a local SQLite database.
+
+    Args:
+        path: Database file (":memory:" for a throwaway database).
+        batch_size: Number of write operations grouped in one transaction.
+                    Use 1 to commit every checkpoint immediately.
+        flush_interval: Seconds after which pending writes are committed even
+                        if the batch is not full (None: only by batch size).
+        cache_kb: SQLite page cache size, in KiB.
+        interrupt_nodes: Nodes the graph interrupts before; a checkpoint
+                         waiting on one of them is committed immediately.
+        serde: Optional LangGraph serializer.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        cache_kb: int = DEFAULT_CACHE_KB,
+        *,
+        flush_interval: float | None = DEFAULT_FLUSH_INTERVAL,
+        interrupt_nodes: Sequence[str] = DEFAULT_INTERRUPT_NODES,
+        serde=None,
+    ):
+        super().__init__(serde=serde)
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.interrupt_nodes = frozenset(interrupt_nodes)
+        self._lock = threading.RLock()
+        self._uncommitted = 0
+        self._timer: threading.Timer | None = None
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA cache_size=-{int(cache_kb)}")
+        self._conn.executescript(_SCHEMA)
+        # Commits and closes on garbage collection or at interpreter exit.
+        self._finalizer = weakref.finalize(self, _commit_and_close, self._conn, self._lock)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ---------- Transactions ----------
+
+    def _write(self, statements: Sequence[tuple[str, Any]], commit: bool = False) -> None:
+        """Run write statements inside the current batch transaction (and
+        commit it right away if `commit`)."""
+        with self._lock:
+            if not self._conn.in_transaction:
+                self._conn.execute("BEGIN")
+            for sql, params in statements:
+                if isinstance(params, list):
+                    self._conn.executemany(sql, params)
+                else:
+                    self._conn.execute(sql, params)
+            self._uncommitted += 1
+            if commit or self._uncommitted >= self.batch_size:
+                self.flush()
+            elif self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Commit every pending write."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._finalizer.alive and self._conn.in_transaction:
+                self._conn.execute("COMMIT")
+            self._uncommitted = 0
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        with self._lock:
+            self.flush()
+            self._finalizer()
+
+    # ---------- Reads ----------
+
+    def _load_checkpoint(self, thread_id, checkpoint_ns, row) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, checkpoint_b, metadata_type, metadata_b = row
+        checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+        conn = self._conn
+
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            blob = conn.execute(
+                "SELECT type, value FROM blobs WHERE thread_id=? AND checkpoint_ns=? "
+                "AND channel=? AND version=?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if blob is not None and blob[0] != "empty":
+                channel_values[channel] = self.serde.loads_typed(blob)
+
+        writes = conn.execute(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id=? "
+            "AND checkpoint_ns=? AND checkpoint_id=? ORDER BY task_path, task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata_b)),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((t, v)))
+                for task_id, channel, t, v in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """Fetch one checkpoint (the latest one unless checkpoint_id is set)."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? "
+                    "AND checkpoint_ns=? AND checkpoint_id=?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id=? "
+                    "AND checkpoint_ns=? ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._load_checkpoint(thread_id, checkpoint_ns, row)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first."""
+        where, params = [], []
+        if config:
+            where.append("thread_id=?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns=?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id=?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id<?")
+            params.append(before_id)
+        sql = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_id, type, checkpoint, "
+            "metadata_type, metadata FROM checkpoints"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        for thread_id, checkpoint_ns, *row in rows:
+            if limit is not None and limit <= 0:
+                return
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(k) == v for k, v in filter.items()):
+                    continue
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                item = self._load_checkpoint(thread_id, checkpoint_ns, row)
+            yield item
+
+    # ---------- Writes ----------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Store a checkpoint; channel values are stored once per version."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        values = c.pop("channel_values")
+
+        blobs = []
+        for channel, version in new_versions.items():
+            type_, value = (
+                self.serde.dumps_typed(values[channel]) if channel in values else ("empty", None)
+            )
+            blobs.append((thread_id, checkpoint_ns, channel, str(version), type_, value))
+
+        type_, checkpoint_b = self.serde.dumps_typed(c)
+        metadata_type, metadata_b = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        statements = [
+            (
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                blobs,
+            ),
+            (
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    checkpoint_b,
+                    metadata_type,
+                    metadata_b,
+                ),
+            ),
+        ]
+        parks = False
+        if checkpoint_ns == "":
+            next_nodes = _next_nodes(checkpoint)
+            parks = not self.interrupt_nodes.isdisjoint(next_nodes.split(","))
+            statements.append((
+                "INSERT OR REPLACE INTO threads VALUES (?, ?, ?, ?)",
+                (thread_id, checkpoint["id"], next_nodes, time.time()),
+            ))
+        self._write(statements, commit=parks)
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Store the intermediate writes of a task."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, value_b = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id,
+                WRITES_IDX_MAP.get(channel, idx), channel, type_, value_b, task_path,
+            ))
+        # Special writes (negative idx: errors, interrupts) may be replaced;
+        # regular writes are kept from their first delivery.
+        verb = "INSERT OR REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "INSERT OR IGNORE"
+        self._write([(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)])
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete every checkpoint, blob and write of a thread."""
+        self._write([
+            (f"DELETE FROM {table} WHERE thread_id=?", (thread_id,))
+            for table in ("checkpoints", "blobs", "writes", "threads")
+        ])
+
+    # ---------- Maintenance ----------
+
+    def compact(self, delete_completed: bool = False, older_than: float | None = None) -> int:
+        """Compact completed threads (threads no longer waiting on any node).
+
+        Args:
+            delete_completed: Delete completed threads entirely instead of
+                              keeping their final checkpoint.
+            older_than: Only touch threads last updated more than this many
+                        seconds ago.
+
+        Returns:
+            The number of threads compacted.
+        """
+        cutoff = time.time() - older_than if older_than is not None else float("inf")
+        with self._lock:
+            self.flush()
+            completed = self._conn.execute(
+                "SELECT thread_id, checkpoint_id FROM threads WHERE next_nodes='' AND updated_at<=?",
+                (cutoff,),
+            ).fetchall()
+            self._conn.execute("BEGIN")
+            for thread_id, checkpoint_id in completed:
+                if delete_completed:
+                    for table in ("checkpoints", "blobs", "writes", "threads"):
+                        self._conn.execute(f"DELETE FROM {table} WHERE thread_id=?", (thread_id,))
+                    continue
+                # Keep only the final checkpoint and the blobs it references.
+                latest = self.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_id": checkpoint_id}})
+                keep = {(ch, str(v)) for ch, v in latest.checkpoint["channel_versions"].items()}
+                self._conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id=? AND checkpoint_id!=?",
+                    (thread_id, checkpoint_id),
+                )
+                self._conn.execute("DELETE FROM writes WHERE thread_id=?", (thread_id,))
+                blobs = self._conn.execute(
+                    "SELECT channel, version FROM blobs WHERE thread_id=?", (thread_id,)
+                ).fetchall()
+                self._conn.executemany(
+                    "DELETE FROM blobs WHERE thread_id=? AND channel=? AND version=?",
+                    [(thread_id, ch, v) for ch, v in blobs if (ch, v) not in keep],
+                )
+                self._conn.execute(
+                    "UPDATE checkpoints SET parent_id=NULL WHERE thread_id=?", (thread_id,)
+                )
+            self._conn.execute("COMMIT")
+        return len(completed)
+
+    def thread_ids(self, waiting_on: str | None = None) -> "list[str]":
+        """Thread ids known to the saver, optionally only those whose latest
+        checkpoint waits on the node `waiting_on` (e.g. "human_review"),
+        alone or together with other nodes."""
+        with self._lock:
+            if waiting_on is None:
+                rows = self._conn.execute("SELECT thread_id FROM threads ORDER BY updated_at")
+            else:
+                # Membership in the comma-separated list, not equality.
+                rows = self._conn.execute(
+                    "SELECT thread_id FROM threads WHERE instr(',' || next_nodes || ',', ?) > 0"
+                    " ORDER BY updated_at",
+                    (f",{waiting_on},",),
+                )
+            return [row[0] for row in rows]
+
+    # ---------- Async API (SQLite calls are local and short) ----------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path="") -> None:
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return self.delete_thread(thread_id)
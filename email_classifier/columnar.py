@@ -0,0 +1,233 @@
+"""
+Columnar bulk I/O
+=================
+
+Replaying millions of archived emails through `classify_batch` as JSON
+dicts, and keeping every full state dict it returns, spends most of its
+time allocating. This module reads the emails from columnar files in record
+batches, classifies each batch, and writes back only the columns that
+matter:
+
+    input   email_id, subject, body, sender, urls (list of strings),
+            has_attachments          -- missing columns get the EmailState
+                                        defaults
+    output  email_id, threat_level, spam_score (null when the content was
+            not analyzed), flagged_urls (list of strings), response
+
+Formats are chosen by file extension:
+
+    .parquet                 Parquet, read batch by batch (pyarrow)
+    .arrow / .feather / .ipc Arrow IPC, memory-mapped (pyarrow): record
+                             batches are views on the mapped file, so the
+                             body strings are not copied before they are
+                             read into the batch
+    anything else            JSON lines (".gz" compressed if it ends so);
+                             no dependency
+
+pyarrow is optional: without it only JSON lines are available.
+
+Usage:
+
+    python -m email_classifier.columnar archive.parquet verdicts.parquet
+
+    from email_classifier.columnar import classify_file
+    classify_file("archive.arrow", "verdicts.parquet", batch_size=50_000)
+"""
+
+import argparse
+import gzip
+import json
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for Arrow / Parquet files
+    pa = pq = None
+
+from email_classifier.batch import classify_batch
+from email_classifier.responses import default_templates
+
+
+DEFAULT_BATCH_SIZE = 10_000
+
+INPUT_COLUMNS = ("email_id", "subject", "body", "sender", "urls", "has_attachments")
+OUTPUT_COLUMNS = ("email_id", "threat_level", "spam_score", "flagged_urls", "response")
+
+_DEFAULTS = {"email_id": "", "subject": "", "body": "", "sender": "", "urls": [], "has_attachments": False}
+_PARQUET = (".parquet",)
+_ARROW = (".arrow", ".feather", ".ipc")
+
+
+def _format(path: str) -> str:
+    lower = path.lower()
+    if lower.endswith(_PARQUET):
+        kind = "parquet"
+    elif lower.endswith(_ARROW):
+        kind = "arrow"
+    else:
+        return "jsonl"
+    if pa is None:
+        raise ImportError(f"{path}: reading or writing {kind} files requires pyarrow")
+    return kind
+
+
+# ---------- Reading ----------
+
+def _batch_emails(batch) -> list[dict]:
+    """Email dicts of one record batch, converting each column once."""
+    names = [name for name in INPUT_COLUMNS if name in batch.schema.names]
+    columns = []
+    for name in names:
+        column = batch.column(name)
+        values = column.to_pylist()
+        if column.null_count:
+            default = _DEFAULTS[name]
+            values = [default if value is None else value for value in values]
+        columns.append(values)
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def _record_batches(path: str, kind: str, batch_size: int):
+    if kind == "parquet":
+        parquet = pq.ParquetFile(path)
+        names = parquet.schema_arrow.names
+        columns = [name for name in INPUT_COLUMNS if name in names]
+        yield from parquet.iter_batches(batch_size=batch_size, columns=columns)
+        return
+    with pa.memory_map(path, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:  # IPC stream format
+            source.seek(0)
+            batches = pa.ipc.open_stream(source)
+        for batch in batches:
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+
+
+def _jsonl_batches(path: str, batch_size: int):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        lines = (line for line in f if line.strip())
+        while True:
+            chunk = [json.loads(line) for line in islice(lines, batch_size)]
+            if not chunk:
+                return
+            yield chunk
+
+
+def read_email_batches(path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Yield lists of at most `batch_size` email dicts (MOCK_EMAILS shape)."""
+    kind = _format(path)
+    if kind == "jsonl":
+        yield from _jsonl_batches(path, batch_size)
+        return
+    for batch in _record_batches(path, kind, batch_size):
+        yield _batch_emails(batch)
+
+
+# ---------- Writing ----------
+
+def result_columns(results: list[dict]) -> dict[str, list]:
+    """The output columns of classified results (responses left out by
+    lazy_responses are rendered with the default templates)."""
+    render = default_templates().render
+    return {
+        "email_id": [r.get("email_id", "") for r in results],
+        "threat_level": [r.get("threat_level", "") for r in results],
+        "spam_score": [(r.get("content_analysis") or {}).get("spam_score") for r in results],
+        "flagged_urls": [(r.get("url_check_result") or {}).get("flagged_urls", []) for r in results],
+        "response": [r["response"] if "response" in r else render(r) for r in results],
+    }
+
+
+def _output_schema():
+    return pa.schema([
+        ("email_id", pa.string()),
+        ("threat_level", pa.string()),
+        ("spam_score", pa.float64()),
+        ("flagged_urls", pa.list_(pa.string())),
+        ("response", pa.string()),
+    ])
+
+
+class ResultWriter:
+    """Writes result columns to `path`, one batch at a time.
+
+    Use as a context manager, or call `close()` when done.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self._kind = _format(path)
+        if self._kind == "parquet":
+            self._writer = pq.ParquetWriter(path, _output_schema())
+        elif self._kind == "arrow":
+            self._sink = pa.OSFile(path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, _output_schema())
+        else:
+            opener = gzip.open if path.endswith(".gz") else open
+            self._writer = opener(path, "wt", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, results: list[dict]) -> None:
+        """Append the output columns of `results`."""
+        columns = result_columns(results)
+        if self._kind == "jsonl":
+            for row in zip(*columns.values()):
+                self._writer.write(json.dumps(dict(zip(OUTPUT_COLUMNS, row))))
+                self._writer.write("\n")
+        else:
+            self._writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=_output_schema()))
+        self.rows += len(results)
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._kind == "arrow":
+            self._sink.close()
+
+
+# ---------- Pipeline ----------
+
+def classify_file(source: str, destination: str, batch_size: int = DEFAULT_BATCH_SIZE, **options) -> int:
+    """Classify every email of `source` and write the verdicts to `destination`.
+
+    Args:
+        source: Input file (.parquet, .arrow / .feather / .ipc, or JSON lines).
+        destination: Output file, same formats.
+        batch_size: Emails per record batch (and per classify_batch call).
+        **options: Passed on to `classify_batch` (index, automaton, scoring,
+                   reputation, extract_urls, lazy_responses).
+
+    Returns:
+        The number of emails classified.
+    """
+    with ResultWriter(destination) as writer:
+        for emails in read_email_batches(source, batch_size):
+            writer.write(classify_batch(emails, **options))
+        return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classify a columnar (or JSON lines) email archive.")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--extract-urls", action="store_true", help="also check links found in the bodies")
+    args = parser.parse_args(argv)
+
+    count = classify_file(args.source, args.destination, args.batch_size, extract_urls=args.extract_urls)
+    print(f"{args.destination}: {count} emails")
+
+
+if __name__ == "__main__":
+    main()
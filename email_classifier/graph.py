@@ -18,7 +18,7 @@ Key concepts:
   - END                          -- special constant: stop the graph
   - graph.compile()              -- finalize and return a runnable graph
 
-TODO: complete the two TODOs in build_email_classifier() below.
+`build_email_classifier()` below wires the Part 2 nodes into the classifier.
 """
 
 from langgraph.graph import StateGraph, START, END
@@ -46,9 +46,13 @@ def route_after_urls(state: EmailState) -> str:
 
 # ---------- Graph builder ----------
 
-def build_email_classifier():
+def build_email_classifier(metrics=None):
     """Build and compile the email classifier graph.
 
+    Args:
+        metrics: Optional metrics.Metrics registry recording per-node
+            timings; when None the nodes are not wrapped.
+
     The graph looks like this:
 
         check_urls ──?──> analyze_content ──> generate_response ──> END
@@ -58,9 +62,13 @@ def build_email_classifier():
     workflow = StateGraph(EmailState)
 
     # -- Nodes --
-    workflow.add_node("check_urls", check_urls)
-    # TODO: add the "analyze_content" node
-    workflow.add_node("generate_response", generate_response)
+    nodes = {
+        "check_urls": check_urls,
+        "analyze_content": analyze_content,
+        "generate_response": generate_response,
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, metrics.wrap(name, node) if metrics is not None else node)
 
     # -- Edges --
     workflow.add_edge(START, "check_urls")
@@ -74,7 +82,7 @@ def build_email_classifier():
         },
     )
 
-    # TODO: add a normal edge from "analyze_content" to "generate_response"
+    workflow.add_edge("analyze_content", "generate_response")
 
     workflow.add_edge("generate_response", END)
 
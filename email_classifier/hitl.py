@@ -70,15 +70,23 @@ def route_after_analysis(state: EmailState) -> str:
     Returns:
         The name of the next node.
     """
-    # TODO: implement (~ 3 lines)
-    ...
+    if state.threat_level == "suspicious":
+        return "human_review"
+    return "generate_response"
 
 
 # ---------- Graph builder ----------
 
-def build_hitl_graph():
+def build_hitl_graph(checkpointer=None, metrics=None):
     """Build the email classifier graph WITH human-in-the-loop.
 
+    Args:
+        checkpointer: Optional checkpointer to persist paused threads (e.g. a
+            SqliteCheckpointSaver from email_classifier.checkpoint). Defaults
+            to a fresh InMemorySaver.
+        metrics: Optional metrics.Metrics registry recording per-node
+            timings and review waits; when None the nodes are not wrapped.
+
     The graph:
 
         check_urls ──?──> analyze_content ──?──> human_review ──> generate_response ──> END
@@ -103,11 +111,46 @@ def build_hitl_graph():
               "generate_response" -> "generate_response"
         6. Add edge: "human_review" -> "generate_response"
         7. Add edge: "generate_response" -> END
-        8. Create an InMemorySaver checkpointer.
+        8. Use the `checkpointer` argument, or create an InMemorySaver
+           checkpointer if it is None.
         9. Compile with:
               - checkpointer=<your checkpointer>
               - interrupt_before=["human_review"]
        10. Return the compiled graph.
     """
-    # TODO: implement (~ 18 lines)
-    ...
+    workflow = StateGraph(EmailState)
+
+    # -- Nodes --
+    nodes = {
+        "check_urls": check_urls,
+        "analyze_content": analyze_content,
+        "human_review": human_review,
+        "generate_response": generate_response,
+    }
+    for name, node in nodes.items():
+        workflow.add_node(name, metrics.wrap(name, node) if metrics is not None else node)
+
+    # -- Edges --
+    workflow.add_edge(START, "check_urls")
+    workflow.add_conditional_edges(
+        "check_urls",
+        route_after_urls,
+        {
+            "analyze_content": "analyze_content",
+            "generate_response": "generate_response",
+        },
+    )
+    workflow.add_conditional_edges(
+        "analyze_content",
+        route_after_analysis,
+        {
+            "human_review": "human_review",
+            "generate_response": "generate_response",
+        },
+    )
+    workflow.add_edge("human_review", "generate_response")
+    workflow.add_edge("generate_response", END)
+
+    if checkpointer is None:
+        checkpointer = InMemorySaver()
+    return workflow.compile(checkpointer=checkpointer, interrupt_before=["human_review"])
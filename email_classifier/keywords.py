@@ -0,0 +1,445 @@
+"""
+Compiled keyword matching for the content analyzer.
+
+`mock_data.analyze_content_keywords` runs one `kw in text` substring scan per
+entry in SPAM_KEYWORDS, so its cost grows with (number of keywords x text
+length). This module compiles the keyword list into an Aho-Corasick automaton
+that finds every keyword in a single pass over the text, whatever the size of
+the list.
+
+The automaton is built once per version of SPAM_KEYWORDS and reused until the
+list is replaced (rebound, or a module reload) or `invalidate_automaton()` is
+called after changing it in place.
+
+For short lists (fewer than AUTOMATON_MIN_KEYWORDS patterns) a handful of
+C-level substring scans is still faster than a Python-level pass over the
+text, so the engine keeps using them there. See benchmarks/bench_keywords.py.
+
+Very large bodies (inline HTML, base64 attachments) are not copied and
+lowercased as a whole: `analyze_content_stream` scans them chunk by chunk
+(from a str, bytes, a file-like object or any iterable of chunks), carrying
+the matcher state across chunk boundaries, so peak memory depends on the
+chunk size only. It can also stop as soon as the email is provably
+suspicious. `analyze_content_decision` builds on this for routing-only
+callers: it returns as soon as the verdict is settled and marks the
+result as partial.
+
+Usage:
+
+    from email_classifier.keywords import analyze_content_keywords
+    result = analyze_content_keywords(subject, body)   # same dict as mock_data
+
+    with open("message.eml", "rb") as f:
+        result = analyze_content_stream(subject, f)
+"""
+
+import codecs
+import math
+from collections import deque
+from contextvars import ContextVar
+
+from email_classifier import mock_data
+
+
+# Below this many distinct patterns, `pattern in text` beats the automaton.
+AUTOMATON_MIN_KEYWORDS = 256
+
+# Same threshold as mock_data.analyze_content_keywords.
+SUSPICIOUS_THRESHOLD = 0.15
+
+# Set (per context) to a threading.Event by branches.content_branch: a
+# streaming scan stops with ScanCancelled once the event is set.
+_cancel_event: ContextVar = ContextVar("cancel_event", default=None)
+
+
+class ScanCancelled(Exception):
+    """A streaming scan was cancelled before reaching the end of the body."""
+
+
+# Bodies longer than this are scanned chunk by chunk (see analyze_content_stream).
+STREAM_MIN_CHARS = 1 << 20
+DEFAULT_CHUNK_CHARS = 64 * 1024
+
+
+# ---------- Automaton ----------
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over a list of keywords.
+
+    Matching is case-insensitive in the same way as the original analyzer:
+    keywords are lowercased at build time and the caller is expected to pass
+    lowercased text.
+    """
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = list(keywords)
+
+        # Distinct lowercased patterns; each keyword points at its pattern id.
+        self.patterns: list[str] = []
+        pattern_ids: dict[str, int] = {}
+        self._keyword_patterns = []
+        for kw in self.keywords:
+            pattern = kw.lower()
+            if pattern not in pattern_ids:
+                pattern_ids[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+            self._keyword_patterns.append(pattern_ids[pattern])
+
+        # An empty keyword matches every text, exactly like `"" in text`.
+        self._always = frozenset(pid for pid, p in enumerate(self.patterns) if not p)
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self._build()
+
+    def _build(self) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+
+        # 1. Trie of all patterns.
+        for pid, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append(())
+                state = nxt
+            out[state] = out[state] + (pid,)
+
+        # 2. Failure links (breadth-first), merging outputs along the way.
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+    @property
+    def state_count(self) -> int:
+        """Number of states in the automaton (a rough size indicator)."""
+        return len(self._goto)
+
+    def find_patterns(self, text: str) -> set[int]:
+        """Return the ids of every pattern that occurs in `text` (one pass)."""
+        if len(self.patterns) < AUTOMATON_MIN_KEYWORDS:
+            return {pid for pid, pattern in enumerate(self.patterns) if pattern in text}
+
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(self._always)
+        remaining = len(self.patterns) - len(found)
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hits = out[state]
+            if hits:
+                for pid in hits:
+                    if pid not in found:
+                        found.add(pid)
+                        remaining -= 1
+                if not remaining:
+                    break
+        return found
+
+    def match(self, text: str) -> list[str]:
+        """Return the keywords found in `text`, in keyword-list order.
+
+        Duplicated keywords are reported as many times as they appear in the
+        list, which keeps the result identical to
+        `[kw for kw in keywords if kw.lower() in text]`.
+        """
+        found = self.find_patterns(text)
+        return [kw for kw, pid in zip(self.keywords, self._keyword_patterns) if pid in found]
+
+    def match_many(self, texts) -> list[list[str]]:
+        """Return `match(text)` for every text, scanning them one after another."""
+        find_patterns = self.find_patterns
+        pairs = list(zip(self.keywords, self._keyword_patterns))
+        results = []
+        for text in texts:
+            found = find_patterns(text)
+            results.append([kw for kw, pid in pairs if pid in found] if found else [])
+        return results
+
+
+class StreamMatcher:
+    """Incremental matcher: feed lowercased text piece by piece.
+
+    Keywords spanning two pieces are found: the automaton state (or, for
+    short lists, the last `longest pattern - 1` characters) is carried over
+    from one piece to the next.
+
+    Args:
+        automaton: The compiled keyword list.
+        stop_at: Stop once this many keywords (counted like `match`, i.e.
+                 with duplicates) have been found. Default: all of them.
+    """
+
+    def __init__(self, automaton: KeywordAutomaton, stop_at: int | None = None):
+        self.automaton = automaton
+        self.found = set(automaton._always)
+        self._weights = [0] * len(automaton.patterns)
+        for pid in automaton._keyword_patterns:
+            self._weights[pid] += 1
+        self.matched_count = sum(self._weights[pid] for pid in self.found)
+        total = len(automaton.keywords)
+        self._target = total if stop_at is None else min(stop_at, total)
+        self._use_automaton = len(automaton.patterns) >= AUTOMATON_MIN_KEYWORDS
+        self._overlap = max(map(len, automaton.patterns), default=1) - 1
+        self._state = 0
+        self._tail = ""
+
+    @property
+    def done(self) -> bool:
+        """True once the `stop_at` target is reached (nothing left to learn)."""
+        return self.matched_count >= self._target
+
+    def feed(self, text: str) -> bool:
+        """Scan the next piece of (lowercased) text. Returns `done`."""
+        if self.done:
+            return True
+        found, weights = self.found, self._weights
+
+        if not self._use_automaton:
+            window = self._tail + text
+            for pid, pattern in enumerate(self.automaton.patterns):
+                if pid not in found and pattern in window:
+                    found.add(pid)
+                    self.matched_count += weights[pid]
+                    if self.matched_count >= self._target:
+                        return True
+            self._tail = window[-self._overlap:] if self._overlap else ""
+            return self.done
+
+        goto, fail, out = self.automaton._goto, self.automaton._fail, self.automaton._out
+        state = self._state
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hits = out[state]
+            if hits:
+                for pid in hits:
+                    if pid not in found:
+                        found.add(pid)
+                        self.matched_count += weights[pid]
+                if self.matched_count >= self._target:
+                    break
+        self._state = state
+        return self.done
+
+    def matched(self) -> list[str]:
+        """Keywords found so far, in keyword-list order."""
+        found = self.found
+        return [kw for kw, pid in zip(self.automaton.keywords, self.automaton._keyword_patterns) if pid in found]
+
+
+# ---------- Cache (one automaton per SPAM_KEYWORDS generation) ----------
+
+# Bumped by invalidate_automaton(); the cached automaton is reused while both
+# the keyword list (by identity) and the generation are unchanged.
+_generation = 0
+_cached_generation = -1
+_cached_keywords = None
+_cached_automaton = None
+
+# Automaton pinned for the current context by rules.use_rules (None: SPAM_KEYWORDS).
+_active_automaton: ContextVar = ContextVar("active_automaton", default=None)
+
+
+def get_automaton(keywords: list[str] | None = None) -> KeywordAutomaton:
+    """Return the compiled automaton for `keywords` (default: the pinned rule
+    set, or SPAM_KEYWORDS).
+
+    The automaton is rebuilt only when a different keyword list is passed
+    (or SPAM_KEYWORDS is rebound) or after `invalidate_automaton()`, so it is
+    compiled once and then shared by every call. Changing SPAM_KEYWORDS in
+    place is not detected: call `invalidate_automaton()` afterwards.
+    """
+    global _cached_generation, _cached_keywords, _cached_automaton
+
+    if keywords is None:
+        active = _active_automaton.get()
+        if active is not None:
+            return active
+        keywords = mock_data.SPAM_KEYWORDS
+    if keywords is not _cached_keywords or _cached_generation != _generation:
+        _cached_automaton = KeywordAutomaton(keywords)
+        _cached_keywords = keywords
+        _cached_generation = _generation
+    return _cached_automaton
+
+
+def invalidate_automaton() -> None:
+    """Recompile the cached automaton on the next `get_automaton()` call
+    (after SPAM_KEYWORDS, or a list passed to get_automaton, changed in place)."""
+    global _generation
+    _generation += 1
+
+
+# ---------- Analyzer ----------
+
+def analyze_content_keywords(subject: str, body: str, keywords: list[str] | None = None) -> dict:
+    """Drop-in replacement for `mock_data.analyze_content_keywords`.
+
+    Args:
+        subject: Email subject line.
+        body: Email body text.
+        keywords: Keyword list to use (default: SPAM_KEYWORDS).
+
+    Returns:
+        dict with keys:
+            - "spam_score" (float): 0.0 to 1.0, proportion of keywords matched
+            - "matched_keywords" (list[str]): Which keywords were found
+            - "is_suspicious" (bool): True if spam_score >= 0.15
+    """
+    if len(body) > STREAM_MIN_CHARS:
+        return analyze_content_stream(subject, body, keywords)
+    automaton = get_automaton(keywords)
+    text = (subject + " " + body).lower()
+    return make_analysis(automaton.match(text), len(automaton.keywords))
+
+
+def suspicious_match_count(keyword_count: int) -> int | None:
+    """Smallest number of matched keywords that makes an email suspicious.
+
+    None when no number of matches can (empty keyword list).
+    """
+    if not keyword_count:
+        return None
+    n = math.ceil(SUSPICIOUS_THRESHOLD * keyword_count)
+    # Settle float rounding exactly as make_analysis will compare.
+    while n > 0 and (n - 1) / keyword_count >= SUSPICIOUS_THRESHOLD:
+        n -= 1
+    while n / keyword_count < SUSPICIOUS_THRESHOLD:
+        n += 1
+    return n
+
+
+def iter_text_chunks(source, chunk_size: int = DEFAULT_CHUNK_CHARS):
+    """Yield `source` as str chunks of about `chunk_size` characters.
+
+    `source` may be a str, bytes / bytearray / memoryview (UTF-8), a
+    file-like object with `read()` (text or binary), or an iterable of str
+    or bytes chunks. Nothing larger than one chunk is materialized.
+    """
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+        return
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def decode(piece, final=False):
+        return piece if isinstance(piece, str) else decoder.decode(piece, final)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source).cast("B")
+        for start in range(0, len(view), chunk_size):
+            yield decode(view[start:start + chunk_size])
+    elif hasattr(source, "read"):
+        while piece := source.read(chunk_size):
+            yield decode(piece)
+    else:
+        for piece in source:
+            yield decode(piece)
+    if tail := decoder.decode(b"", True):
+        yield tail
+
+
+def analyze_content_stream(
+    subject: str,
+    body,
+    keywords: list[str] | None = None,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_CHARS,
+    stop_when_suspicious: bool = False,
+) -> dict:
+    """Streaming version of `analyze_content_keywords`.
+
+    The body is lowercased and scanned one chunk at a time, so peak memory
+    does not grow with the body size.
+
+    Args:
+        subject: Email subject line.
+        body: The body, as anything `iter_text_chunks` accepts.
+        keywords: Keyword list to use (default: SPAM_KEYWORDS).
+        chunk_size: Characters (or bytes) read per chunk.
+        stop_when_suspicious: Stop reading as soon as enough keywords have
+            matched for `is_suspicious` to be True. "spam_score" and
+            "matched_keywords" then only cover the keywords found so far,
+            and the result carries "partial": True.
+
+    Returns:
+        Same dict as `analyze_content_keywords`.
+
+    Raises:
+        ScanCancelled: The scan was cancelled by the parallel URL branch
+            (see branches.py).
+    """
+    automaton = get_automaton(keywords)
+    keyword_count = len(automaton.keywords)
+    stop_at = suspicious_match_count(keyword_count) if stop_when_suspicious else None
+    matcher = StreamMatcher(automaton, stop_at=stop_at)
+
+    cancel = _cancel_event.get()
+
+    # Same text as analyze_content_keywords: subject + " " + body.
+    if not matcher.feed((subject + " ").lower()):
+        for chunk in iter_text_chunks(body, chunk_size):
+            if cancel is not None and cancel.is_set():
+                raise ScanCancelled()
+            if matcher.feed(chunk.lower()):
+                break
+    result = make_analysis(matcher.matched(), keyword_count)
+    if stop_when_suspicious and matcher.done and matcher.matched_count < keyword_count:
+        result["partial"] = True
+    return result
+
+
+def analyze_content_decision(subject: str, body: str, keywords: list[str] | None = None) -> dict:
+    """Decision-only analysis: scan only until `is_suspicious` is settled.
+
+    "is_suspicious" is always exact. Once enough keywords have matched to
+    make the email suspicious, scanning stops and the result is marked
+    "partial": True -- "spam_score" and "matched_keywords" are then lower
+    bounds. Safe emails are scanned to the end and get a complete result.
+    Use `complete_analysis` to fill in a partial result when the details
+    are actually needed.
+    """
+    return analyze_content_stream(subject, body, keywords, stop_when_suspicious=True)
+
+
+def complete_analysis(analysis: dict | None, subject: str, body: str, keywords: list[str] | None = None) -> dict:
+    """Return `analysis` itself if complete, otherwise the full analysis."""
+    if analysis is not None and not analysis.get("partial"):
+        return analysis
+    return analyze_content_keywords(subject, body, keywords)
+
+
+def make_analysis(matched: list[str], keyword_count: int) -> dict:
+    """Build the analysis dict from the matched keywords.
+
+    Args:
+        matched: Keywords found in the text.
+        keyword_count: Size of the keyword list the text was scanned with.
+    """
+    score = len(matched) / keyword_count if keyword_count else 0.0
+
+    return {
+        "spam_score": round(score, 3),
+        "matched_keywords": matched,
+        "is_suspicious": score >= SUSPICIOUS_THRESHOLD,
+    }
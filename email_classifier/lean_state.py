@@ -0,0 +1,192 @@
+"""
+Lean state schema
+=================
+
+`EmailState` is a Pydantic model: LangGraph validates and copies it every
+time a node reads the state, and every HITL checkpoint stores the full body
+text again. `LeanEmailState` is a drop-in alternative for high-volume runs:
+
+  - a `__slots__` dataclass: no validation, no per-instance `__dict__`;
+  - the body is kept out of the state. It is stored once in a
+    content-addressed `BodyStore` and the state only carries `body_ref`
+    (its SHA-256). Nodes still read `state.body`, which is looked up in
+    the store on access;
+  - the store is reference-counted: each `lean_input()` holds one
+    reference, released by `build_pipeline(state_schema=LeanEmailState)`
+    once the run reaches its last node (generate_response), or as soon as
+    a node raises (the run ends there). Paused HITL threads keep their
+    body until they are resumed and complete; a thread that will never be
+    resumed gives its body back with `release_thread`. The store thus only
+    holds the bodies of runs still in flight. Prepare one input per invoke.
+
+Select it when building a graph (see pipeline.py):
+
+    from email_classifier.lean_state import LeanEmailState, lean_input
+    graph = build_pipeline(state_schema=LeanEmailState)
+    result = graph.invoke(lean_input(email))
+
+    release_thread(hitl_graph, config)   # paused thread abandoned by review
+
+benchmarks/bench_state.py compares per-email latency, allocations and
+checkpoint size of both schemas.
+"""
+
+import functools
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from langgraph.errors import GraphBubbleUp
+
+
+# ---------- Body store ----------
+
+class BodyStore:
+    """Content-addressed storage for email bodies.
+
+    Identical bodies (bulk mail) are stored once and counted once per
+    `put`; `release` drops a body from memory when its count reaches zero.
+    With `directory` set, the bodies are also written to files named after
+    their hash, so that a restarted process can resolve the refs held by
+    persisted checkpoints (a body read back from disk is held until its next
+    release). Files are only removed by `discard`.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory
+        self._bodies: dict[str, str] = {}
+        self._refs: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._bodies)
+
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.directory, ref + ".txt")
+
+    def put(self, body: str) -> str:
+        """Store a body (one more reference to it) and return its ref."""
+        ref = hashlib.sha256(body.encode("utf-8", "surrogatepass")).hexdigest()
+        with self._lock:
+            self._refs[ref] = self._refs.get(ref, 0) + 1
+            if ref not in self._bodies:
+                self._bodies[ref] = body
+                if self.directory and not os.path.exists(self._path(ref)):
+                    with open(self._path(ref), "w", encoding="utf-8", errors="surrogatepass") as f:
+                        f.write(body)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """Return the body for `ref` ("" for an empty ref)."""
+        if not ref:
+            return ""
+        body = self._bodies.get(ref)
+        if body is None and self.directory:
+            with open(self._path(ref), encoding="utf-8", errors="surrogatepass") as f:
+                body = f.read()
+            with self._lock:
+                self._bodies[ref] = body
+        if body is None:
+            raise KeyError(f"unknown body ref {ref!r}")
+        return body
+
+    def release(self, ref: str) -> None:
+        """Drop one reference to a body; the last one frees its memory."""
+        if not ref:
+            return
+        with self._lock:
+            count = self._refs.pop(ref, 0) - 1
+            if count > 0:
+                self._refs[ref] = count
+            else:
+                self._bodies.pop(ref, None)
+
+    def discard(self, ref: str) -> None:
+        """Drop a body from memory (and from disk), whatever its references."""
+        with self._lock:
+            self._bodies.pop(ref, None)
+            self._refs.pop(ref, None)
+            if self.directory and os.path.exists(self._path(ref)):
+                os.remove(self._path(ref))
+
+
+_default_store = BodyStore()
+
+
+def default_body_store() -> BodyStore:
+    return _default_store
+
+
+def set_default_body_store(store: BodyStore) -> None:
+    """Use `store` for every LeanEmailState from now on."""
+    global _default_store
+    _default_store = store
+
+
+# ---------- State ----------
+
+@dataclass(slots=True)
+class LeanEmailState:
+    # -- Email metadata --
+    email_id: str = ""
+    subject: str = ""
+    body_ref: str = ""
+    sender: str = ""
+    urls: list[str] = field(default_factory=list)
+    has_attachments: bool = False
+
+    # -- Analysis results (filled in by graph nodes) --
+    url_check_result: Optional[dict] = None
+    content_analysis: Optional[dict] = None
+    threat_level: str = ""
+    response: str = ""
+
+    @property
+    def body(self) -> str:
+        """The email body, resolved from the body store."""
+        return _default_store.get(self.body_ref)
+
+
+def lean_input(email: dict) -> dict:
+    """Convert an email dict (MOCK_EMAILS shape) to a LeanEmailState input.
+
+    The body is moved to the default body store and replaced by its ref;
+    the reference is released when the run completes (see `release_body`).
+    """
+    lean = {k: v for k, v in email.items() if k != "body"}
+    lean["body_ref"] = _default_store.put(email["body"]) if email.get("body") else ""
+    return lean
+
+
+def release_body(node, last: bool = True):
+    """Wrap a node of a LeanEmailState graph so that the state's body
+    reference is released from the default body store when the node raises
+    (the run ends there) and, for the last node, once it has run.
+
+    A failed HITL thread retried with `invoke(None, config)` can only read
+    its body again from a store with a `directory`.
+    """
+    @functools.wraps(node)
+    def wrapper(state):
+        try:
+            result = node(state)
+        except GraphBubbleUp:  # interrupts: the run is paused, not over
+            raise
+        except Exception:
+            _default_store.release(state.body_ref)
+            raise
+        if last:
+            _default_store.release(state.body_ref)
+        return result
+
+    return wrapper
+
+
+def release_thread(graph, config: dict) -> None:
+    """Release the body reference of a paused thread that will not be
+    resumed (e.g. dropped from review). Call it once per thread."""
+    _default_store.release(graph.get_state(config).values.get("body_ref", ""))
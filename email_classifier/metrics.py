@@ -0,0 +1,207 @@
+"""
+Per-node instrumentation.
+
+An opt-in `Metrics` registry records, for every node of the graph:
+
+  - a latency histogram and a call / error count;
+  - the amount of text handed to analyze_content (UTF-8 bytes of subject +
+    body);
+  - for the HITL graph, how long each thread waited at the human_review
+    interrupt (from the end of analyze_content to the start of
+    human_review, per thread_id).
+
+Node cache hits and misses (see cache.py) are exported alongside.
+
+Instrumentation is applied when the graph is built, so a graph built
+without it runs the plain node functions (zero overhead):
+
+    from email_classifier.metrics import Metrics
+    metrics = Metrics()
+    graph = build_pipeline(metrics=metrics)   # also build_email_classifier / build_hitl_graph
+    ...
+    print(metrics.to_prometheus())      # Prometheus text exposition format
+    metrics.dump_json("metrics.json")   # or a local JSON dump
+"""
+
+import bisect
+import json
+import threading
+import time
+
+from email_classifier import cache
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REVIEW_WAIT_BUCKETS = (1, 10, 60, 300, 900, 3600, 4 * 3600, 24 * 3600)
+
+PREFIX = "email_classifier"
+
+
+def _utf8_len(text: str) -> int:
+    # ASCII text (most mail) has one byte per character: skip the encode.
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: `le` upper bounds)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, cumulative count) pairs, ending with "+Inf"."""
+        result, total = [], 0
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> dict:
+        return {"buckets": dict(self.cumulative()), "sum": self.sum, "count": self.count}
+
+
+class Metrics:
+    """Thread-safe registry of node metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[str, Histogram] = {}
+        self.calls: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.text_bytes_scanned = 0
+        self.review_wait = Histogram(REVIEW_WAIT_BUCKETS)
+        self._paused_at: dict[str, float] = {}
+
+    # ---------- Recording ----------
+
+    def observe_call(self, node: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            hist = self.latency.get(node)
+            if hist is None:
+                hist = self.latency[node] = Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            self.calls[node] = self.calls.get(node, 0) + 1
+            if failed:
+                self.errors[node] = self.errors.get(node, 0) + 1
+
+    def wrap(self, name: str, node):
+        """Return `node` wrapped with timing (and node-specific counters)."""
+        observe = self.observe_call
+
+        def instrumented(state, config):
+            thread_id = (config or {}).get("configurable", {}).get("thread_id")
+            if name == "analyze_content":
+                with self._lock:
+                    self.text_bytes_scanned += _utf8_len(state.subject) + _utf8_len(state.body)
+            elif name in ("human_review", "generate_response") and thread_id is not None:
+                # A reviewer override that settles the verdict (e.g. "safe")
+                # routes straight to generate_response, skipping human_review.
+                with self._lock:
+                    paused_at = self._paused_at.pop(thread_id, None)
+                    if paused_at is not None:
+                        self.review_wait.observe(time.time() - paused_at)
+
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = node(state)
+                failed = False
+            finally:
+                observe(name, time.perf_counter() - start, failed)
+
+            if thread_id is not None:
+                with self._lock:
+                    if name == "analyze_content" and result.get("threat_level") == "suspicious":
+                        self._paused_at[thread_id] = time.time()
+            return result
+
+        instrumented.__name__ = getattr(node, "__name__", name)
+        return instrumented
+
+    # ---------- Export ----------
+
+    def to_dict(self) -> dict:
+        """All metrics as plain JSON-serializable data."""
+        with self._lock:
+            data = {
+                "nodes": {
+                    node: {
+                        "calls": self.calls.get(node, 0),
+                        "errors": self.errors.get(node, 0),
+                        "latency_seconds": hist.to_dict(),
+                    }
+                    for node, hist in self.latency.items()
+                },
+                "text_bytes_scanned": self.text_bytes_scanned,
+                "review_wait_seconds": self.review_wait.to_dict(),
+                "reviews_pending": len(self._paused_at),
+            }
+        node_cache = cache.node_cache()
+        data["cache"] = node_cache.stats() if node_cache is not None else None
+        return data
+
+    def dump_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        data = self.to_dict()
+        lines = []
+
+        def histogram(metric: str, help_text: str, series: list[tuple[str, dict]]) -> None:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, hist in series:
+                sep = "," if labels else ""
+                for le, count in hist["buckets"].items():
+                    lines.append(f'{metric}_bucket{{{labels}{sep}le="{le}"}} {count}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{metric}_sum{suffix} {hist['sum']}")
+                lines.append(f"{metric}_count{suffix} {hist['count']}")
+
+        def counter(metric: str, help_text: str, series: list[tuple[str, int]], kind: str = "counter") -> None:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in series:
+                lines.append(f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}")
+
+        nodes = data["nodes"]
+        histogram(
+            f"{PREFIX}_node_latency_seconds", "Time spent in each graph node.",
+            [(f'node="{n}"', v["latency_seconds"]) for n, v in nodes.items()],
+        )
+        counter(
+            f"{PREFIX}_node_calls_total", "Number of node executions.",
+            [(f'node="{n}"', v["calls"]) for n, v in nodes.items()],
+        )
+        counter(
+            f"{PREFIX}_node_errors_total", "Number of node executions that raised.",
+            [(f'node="{n}"', v["errors"]) for n, v in nodes.items()],
+        )
+        counter(
+            f"{PREFIX}_text_bytes_scanned_total", "UTF-8 bytes of subject + body passed to analyze_content.",
+            [("", data["text_bytes_scanned"])],
+        )
+        histogram(
+            f"{PREFIX}_review_wait_seconds", "Time threads waited at the human_review interrupt.",
+            [("", data["review_wait_seconds"])],
+        )
+        counter(
+            f"{PREFIX}_reviews_pending", "Threads paused before human_review (seen by this process).",
+            [("", data["reviews_pending"])], kind="gauge",
+        )
+        if data["cache"] is not None:
+            counter(
+                f"{PREFIX}_cache_lookups_total", "Node cache lookups.",
+                [('result="hit"', data["cache"]["hits"]), ('result="miss"', data["cache"]["misses"])],
+            )
+        return "\n".join(lines) + "\n"
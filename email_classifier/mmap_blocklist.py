@@ -0,0 +1,197 @@
+"""
+Memory-mapped compact blocklist
+===============================
+
+A production blocklist of millions of domains costs hundreds of MB as a
+Python set (or BlocklistIndex trie) in *every* worker process, plus seconds
+of start-up to build it. This module stores it as one read-only binary
+table that processes `mmap` instead of loading:
+
+    header   magic, entry count, data offset, BLAKE2 checksum
+    offsets  (count + 1) little-endian uint64, relative to the data area
+    data     reversed domains ("com.malware-site"), UTF-8, sorted bytewise
+
+Opening the file only maps it, so start-up takes milliseconds whatever its
+size, and every process shares the same pages of the OS page cache.
+Lookups binary-search the table for each parent-domain candidate of a host
+(at most a handful per host), reading only the pages they touch.
+
+`MappedBlocklist` has the same lookup interface as `BlocklistIndex`, so it
+can be passed anywhere an index is accepted:
+
+    python -m email_classifier.mmap_blocklist build domains.txt blocklist.bin
+
+    from email_classifier.mmap_blocklist import MappedBlocklist
+    with MappedBlocklist("blocklist.bin") as index:
+        result = check_urls_against_blocklist(urls, index=index)
+
+A rules directory (see rules.py) holding a `blocklist.bin` uses it instead
+of `blocklist.txt`.
+"""
+
+import argparse
+import gzip
+import hashlib
+import mmap
+import struct
+import sys
+
+from email_classifier.blocklist import BlocklistIndex
+
+
+MAGIC = b"EMBLK\x00\x01\x00"
+HEADER = struct.Struct("<8sQQ16s")  # magic, count, data offset, checksum
+OFFSET = struct.Struct("<Q")
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", "surrogatepass")
+
+
+def _reverse(domain: str) -> str:
+    return ".".join(reversed(domain.split(".")))
+
+
+# ---------- Build ----------
+
+def build_compact_blocklist(domains, path: str) -> int:
+    """Write `domains` (e.g. URL_BLOCKLIST) as a compact table at `path`.
+
+    Returns:
+        The number of distinct domains written.
+    """
+    entries = sorted({_encode(_reverse(domain)) for domain in domains if domain})
+
+    offsets = bytearray()
+    position = 0
+    for entry in entries:
+        offsets += OFFSET.pack(position)
+        position += len(entry)
+    offsets += OFFSET.pack(position)
+
+    checksum = hashlib.blake2b(digest_size=16)
+    checksum.update(offsets)
+    for entry in entries:
+        checksum.update(entry)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(entries), HEADER.size + len(offsets), checksum.digest()))
+        f.write(offsets)
+        for entry in entries:
+            f.write(entry)
+    return len(entries)
+
+
+# ---------- Query ----------
+
+class MappedBlocklist:
+    """Read-only, memory-mapped view of a table written by
+    `build_compact_blocklist`. Same lookups as `BlocklistIndex`."""
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise OSError("MappedBlocklist requires a little-endian host")
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, data_offset, checksum = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path}: not a compact blocklist file")
+        self._count = count
+        self._data = data_offset
+        self._offsets = memoryview(self._mmap)[HEADER.size:data_offset].cast("Q")
+        self.checksum = checksum.hex()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self._offsets.release()
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int) -> bytes:
+        data, offsets = self._data, self._offsets
+        return self._mmap[data + offsets[i]:data + offsets[i + 1]]
+
+    def _search(self, key: bytes, lo: int = 0) -> tuple[bool, int]:
+        """Binary search: (found, insertion point) of `key` in [lo, count)."""
+        mm, offsets, data = self._mmap, self._offsets, self._data
+        hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mm[data + offsets[mid]:data + offsets[mid + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < self._count and self._entry(lo) == key, lo
+
+    def __contains__(self, domain: str) -> bool:
+        """Exact membership (no parent-domain matching)."""
+        return self._search(_encode(_reverse(domain)))[0]
+
+    def domains(self):
+        """Yield every blocklisted domain, in sorted reversed-label order."""
+        for i in range(self._count):
+            yield _reverse(self._entry(i).decode("utf-8", "surrogatepass"))
+
+    # ---------- Lookups ----------
+
+    def is_blocked(self, host: str) -> bool:
+        """True if `host` or any of its parent domains (2+ labels) is listed."""
+        labels = host.split(".")
+        if len(labels) < 2:
+            return False
+        key = labels[-1]
+        lo = 0
+        for label in reversed(labels[:-1]):
+            key = key + "." + label
+            # Longer candidates sort after shorter ones: narrow the search.
+            found, lo = self._search(_encode(key), lo)
+            if found:
+                return True
+        return False
+
+    # Only relies on self.is_blocked.
+    check_urls = BlocklistIndex.check_urls
+
+
+# ---------- Build tool ----------
+
+def _read_domains(path: str, reversed_input: bool):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield _reverse(line) if reversed_input else line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a compact blocklist file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a table from a domain list (one per line, .gz ok)")
+    build.add_argument("source")
+    build.add_argument("output")
+    build.add_argument("--reversed", action="store_true",
+                       help="source holds reversed domains (BlocklistIndex.save format)")
+    info = commands.add_parser("info", help="print the entry count and checksum of a table")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_compact_blocklist(_read_domains(args.source, args.reversed), args.output)
+        print(f"{args.output}: {count} domains")
+    else:
+        with MappedBlocklist(args.path) as index:
+            print(f"{args.path}: {len(index)} domains, checksum {index.checksum}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,19 +9,18 @@ In LangGraph, a **node** is a regular Python function that:
 The returned dict is merged into the state automatically.
 You do NOT need to return the entire state -- only the keys that changed.
 
-Node 1 is already implemented as an example.
-TODO: implement nodes 2 and 3.
+Node 1 is the reference example; nodes 2 and 3 follow the same pattern.
 """
 
 from email_classifier.state import EmailState
-from email_classifier.mock_data import (
-    check_urls_against_blocklist,
-    analyze_content_keywords,
-)
+from email_classifier.blocklist import check_urls_against_blocklist
+from email_classifier.keywords import analyze_content_keywords
+from email_classifier.cache import memoize_node
 
 
 # ---------- Node 1: check_urls (provided) ----------
 
+@memoize_node("urls")
 def check_urls(state: EmailState) -> dict:
     """Check the email's URLs against the blocklist."""
     result = check_urls_against_blocklist(state.urls)
@@ -33,6 +32,7 @@ def check_urls(state: EmailState) -> dict:
 
 # ---------- Node 2: analyze_content ----------
 
+@memoize_node("subject", "body")
 def analyze_content(state: EmailState) -> dict:
     """Analyze the email content and determine the threat level.
 
@@ -50,12 +50,20 @@ def analyze_content(state: EmailState) -> dict:
 
     Hint: look at check_urls above for a similar pattern.
     """
-    # TODO: implement (~ 4 lines)
-    ...
+    result = analyze_content_keywords(state.subject, state.body)
+    level = "suspicious" if result["is_suspicious"] else "safe"
+    return {"content_analysis": result, "threat_level": level}
 
 
 # ---------- Node 3: generate_response ----------
 
+RESPONSES = {
+    "dangerous": "ALERT: This email is dangerous. Do not interact with it.",
+    "suspicious": "WARNING: This email looks suspicious. Proceed with caution.",
+    "safe": "This email appears safe. No threats detected.",
+}
+
+
 def generate_response(state: EmailState) -> dict:
     """Generate a response message based on the threat level.
 
@@ -68,5 +76,4 @@ def generate_response(state: EmailState) -> dict:
 
     Hint: read state.threat_level
     """
-    # TODO: implement (~ 5 lines)
-    ...
+    return {"response": RESPONSES.get(state.threat_level, "")}
@@ -0,0 +1,132 @@
+"""
+Multi-process classification
+============================
+
+`check_urls_against_blocklist` and `analyze_content_keywords` are pure
+Python, so one process only ever uses one core. `ParallelClassifier` shards
+a stream of emails into chunks and runs `batch.classify_batch` on a pool of
+worker processes:
+
+  - The rules (blocklist + keywords) are written to a temporary directory
+    once by the parent, the blocklist as a compact table (blocklist.bin,
+    see mmap_blocklist.py). Each worker maps the table -- every worker
+    shares the same page-cache pages instead of building its own trie --
+    and compiles the keyword automaton once, in its initializer. Tasks
+    only carry emails, never the rules.
+  - A bounded window of chunks is in flight, so memory stays flat on
+    arbitrarily long inputs.
+  - Results are merged back in input order.
+
+Usage:
+
+    from email_classifier.parallel import ParallelClassifier, classify_parallel
+
+    with ParallelClassifier(workers=32) as pool:
+        for result in pool.imap(read_mailbox()):
+            ...
+
+    results = classify_parallel(MOCK_EMAILS * 10_000)
+"""
+
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from email_classifier.batch import classify_batch
+from email_classifier.rules import load_rules, write_rules
+
+
+DEFAULT_CHUNK_SIZE = 2_000
+
+
+# ---------- Worker side ----------
+
+_worker_index = None
+_worker_automaton = None
+
+
+def _init_worker(rules_dir: str) -> None:
+    """Map the blocklist and compile the keywords once per worker process."""
+    global _worker_index, _worker_automaton
+
+    ruleset = load_rules(rules_dir)
+    _worker_index, _worker_automaton = ruleset.index, ruleset.automaton
+
+
+def _classify_chunk(emails: list[dict]) -> list[dict]:
+    return classify_batch(emails, index=_worker_index, automaton=_worker_automaton)
+
+
+# ---------- Parent side ----------
+
+class ParallelClassifier:
+    """Pool of worker processes running the batch classifier.
+
+    Args:
+        workers: Number of processes (default: os.cpu_count()).
+        chunk_size: Emails per task.
+        blocklist: Domains to block (default: URL_BLOCKLIST at start-up).
+        keywords: Spam keywords (default: SPAM_KEYWORDS at start-up).
+        mp_context: Optional multiprocessing context (e.g. "spawn" context).
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        blocklist=None,
+        keywords=None,
+        mp_context=None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._rules_dir = tempfile.TemporaryDirectory(prefix="email_classifier_rules_")
+        write_rules(self._rules_dir.name, blocklist, keywords, compact=True)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self._rules_dir.name,),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """Shut the workers down and remove the rules directory."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._rules_dir.cleanup()
+
+    def imap(self, emails):
+        """Classify a stream of emails, yielding results in input order.
+
+        At most two chunks per worker are queued at any time.
+        """
+        emails = iter(emails)
+        in_flight = deque()
+        max_in_flight = 2 * self.workers
+
+        while True:
+            while len(in_flight) < max_in_flight:
+                chunk = list(islice(emails, self.chunk_size))
+                if not chunk:
+                    break
+                in_flight.append(self._executor.submit(_classify_chunk, chunk))
+            if not in_flight:
+                return
+            yield from in_flight.popleft().result()
+
+    def classify(self, emails) -> list[dict]:
+        """Classify a batch of emails and return the results in input order."""
+        return list(self.imap(emails))
+
+
+def classify_parallel(emails, workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> list[dict]:
+    """One-shot helper: start a pool, classify `emails`, shut the pool down."""
+    with ParallelClassifier(workers=workers, chunk_size=chunk_size) as pool:
+        return pool.classify(emails)
@@ -0,0 +1,219 @@
+"""
+Production graph builder
+========================
+
+`build_email_classifier()` (Part 3) and `build_hitl_graph()` (Part 4) build
+the tutorial graphs. `build_pipeline` wires the same nodes and routing
+functions, with the options needed to run them at scale:
+
+    build_pipeline()                      # same graph as build_email_classifier()
+    build_pipeline(hitl=True)             # same graph as build_hitl_graph()
+
+Options:
+    state_schema   -- EmailState (default) or lean_state.LeanEmailState
+    checkpointer   -- HITL only; defaults to an InMemorySaver
+    metrics        -- a metrics.Metrics registry to record per-node timings
+    decision_only  -- analyze_content stops scanning once the verdict is
+                      settled (see keywords.analyze_content_decision); its
+                      content_analysis may then be marked "partial"
+    rules          -- a rules.RuleStore; check_urls / analyze_content run on
+                      its hot-reloadable rules and record the rule version
+    scoring        -- a scoring.ScoringModel; analyze_content scores with
+                      its weighted rules instead of matched / total keywords
+    parallel       -- run check_urls and analyze_content as parallel
+                      branches (see branches.py; not with hitl)
+    reputation     -- a reputation.ReputationIndex; a "sender_reputation"
+                      node sends trusted senders straight to
+                      generate_response and the rest to the full analysis
+    extract_urls   -- an "extract_urls" node canonicalizes `urls` and adds
+                      the links found in the body (see urls.py)
+    lazy_responses -- no response is stored in the state; it is rendered
+                      from threat_level when read (see responses.py)
+"""
+
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import InMemorySaver
+
+from email_classifier.state import EmailState
+from email_classifier.branches import ParallelEmailState, content_branch, url_branch
+from email_classifier.cache import memoize_node
+from email_classifier.keywords import analyze_content_decision
+from email_classifier.lean_state import LeanEmailState, release_body
+from email_classifier.nodes import (
+    check_urls,
+    analyze_content,
+    generate_response,
+)
+from email_classifier.graph import route_after_urls
+from email_classifier.hitl import human_review, route_after_analysis
+from email_classifier.reputation import reputation_node, route_after_reputation
+from email_classifier.responses import defer_response
+from email_classifier import urls as urls_module
+
+
+def _route(path):
+    """Routing function without the EmailState annotation, so that LangGraph
+    hands it the graph's own state schema instead of building an EmailState."""
+    def route(state):
+        return path(state)
+    route.__name__ = path.__name__
+    return route
+
+
+@memoize_node("subject", "body")
+def decide_content(state: EmailState) -> dict:
+    """analyze_content for decision_only graphs.
+
+    Both the routing functions and generate_response only read
+    threat_level, so the scan stops as soon as is_suspicious is settled.
+    A human reviewer who needs the full keyword list gets it from
+    `ReviewQueue.details()`, which completes the analysis on demand.
+    """
+    result = analyze_content_decision(state.subject, state.body)
+    level = "suspicious" if result["is_suspicious"] else "safe"
+    return {"content_analysis": result, "threat_level": level}
+
+
+def _score_content(model):
+    """analyze_content node scoring with a ScoringModel."""
+    def score_content(state: EmailState) -> dict:
+        result = model.score({
+            "subject": state.subject,
+            "body": state.body,
+            "sender": state.sender,
+            "urls": state.urls,
+            "has_attachments": state.has_attachments,
+        })
+        level = "suspicious" if result["is_suspicious"] else "safe"
+        return {"content_analysis": result, "threat_level": level}
+    return score_content
+
+
+def build_pipeline(
+    hitl: bool = False,
+    state_schema=EmailState,
+    checkpointer=None,
+    metrics=None,
+    decision_only: bool = False,
+    rules=None,
+    scoring=None,
+    parallel: bool = False,
+    reputation=None,
+    extract_urls: bool = False,
+    lazy_responses: bool = False,
+):
+    """Build and compile the email classifier graph.
+
+    Args:
+        hitl: Pause suspicious emails before a "human_review" node.
+        state_schema: State class every node receives (EmailState or
+                      LeanEmailState; with LeanEmailState the body reference
+                      is released once generate_response has run, or when
+                      a node raises).
+        checkpointer: Checkpointer for the HITL graph (default: InMemorySaver).
+        metrics: Optional Metrics registry; when None the nodes are not wrapped.
+        decision_only: Run `decide_content` as the analyze_content node.
+        rules: Optional RuleStore; when None the nodes use URL_BLOCKLIST and
+               SPAM_KEYWORDS.
+        scoring: Optional ScoringModel for the analyze_content node (takes
+                 precedence over decision_only).
+        parallel: Run check_urls and analyze_content in parallel, joined
+                  before generate_response. Requires hitl=False and the
+                  EmailState schema (replaced by ParallelEmailState).
+        reputation: Optional ReputationIndex; adds the sender fast path in
+                    front of check_urls.
+        extract_urls: Run `urls.extract_urls` before check_urls (after the
+                      sender fast path, if any).
+        lazy_responses: Replace generate_response with
+                        `responses.defer_response`.
+
+    Returns:
+        The compiled graph.
+    """
+    if parallel:
+        if hitl:
+            raise ValueError("parallel branches are not available with hitl=True")
+        if state_schema is not EmailState:
+            raise ValueError("parallel branches require the EmailState schema")
+        state_schema = ParallelEmailState
+    workflow = StateGraph(state_schema)
+
+    # -- Nodes (input_schema overrides the EmailState annotation of the nodes) --
+    nodes = {}
+    if reputation is not None:
+        nodes["sender_reputation"] = reputation_node(reputation)
+    if extract_urls:
+        nodes["extract_urls"] = urls_module.extract_urls
+    nodes.update({
+        "check_urls": check_urls,
+        "analyze_content": analyze_content,
+        "generate_response": defer_response if lazy_responses else generate_response,
+    })
+    if scoring is not None:
+        nodes["analyze_content"] = _score_content(scoring)
+    elif decision_only:
+        nodes["analyze_content"] = decide_content
+    if hitl:
+        nodes["human_review"] = human_review
+    if parallel:
+        nodes["check_urls"] = url_branch(nodes["check_urls"])
+        nodes["analyze_content"] = content_branch(nodes["analyze_content"])
+    for name, node in nodes.items():
+        if state_schema is LeanEmailState:
+            node = release_body(node, last=name == "generate_response")
+        if rules is not None:
+            node = rules.wrap(name, node)
+        if metrics is not None:
+            node = metrics.wrap(name, node)
+        workflow.add_node(name, node, input_schema=state_schema)
+
+    # -- Edges --
+    analysis = ["check_urls", "analyze_content"] if parallel else ["check_urls"]
+    if extract_urls:
+        for name in analysis:
+            workflow.add_edge("extract_urls", name)
+        analysis = ["extract_urls"]
+    if reputation is not None:
+        def route_sender(state):
+            if route_after_reputation(state) == "generate_response":
+                return "generate_response"
+            return analysis
+
+        workflow.add_edge(START, "sender_reputation")
+        workflow.add_conditional_edges("sender_reputation", route_sender, [*analysis, "generate_response"])
+    else:
+        for name in analysis:
+            workflow.add_edge(START, name)
+
+    if parallel:
+        workflow.add_edge(["check_urls", "analyze_content"], "generate_response")
+        workflow.add_edge("generate_response", END)
+        return workflow.compile()
+
+    workflow.add_conditional_edges(
+        "check_urls",
+        _route(route_after_urls),
+        {
+            "analyze_content": "analyze_content",
+            "generate_response": "generate_response",
+        },
+    )
+    if hitl:
+        workflow.add_conditional_edges(
+            "analyze_content",
+            _route(route_after_analysis),
+            {
+                "human_review": "human_review",
+                "generate_response": "generate_response",
+            },
+        )
+        workflow.add_edge("human_review", "generate_response")
+    else:
+        workflow.add_edge("analyze_content", "generate_response")
+    workflow.add_edge("generate_response", END)
+
+    if not hitl:
+        return workflow.compile()
+    if checkpointer is None:
+        checkpointer = InMemorySaver()
+    return workflow.compile(checkpointer=checkpointer, interrupt_before=["human_review"])
@@ -0,0 +1,294 @@
+"""
+Incremental re-classification
+=============================
+
+When URL_BLOCKLIST gains a domain, finding the retained emails that are now
+dangerous should not mean re-running the whole graph over the mailbox.
+`ReclassificationIndex` keeps past results (graph or classify_batch
+outputs) with two inverted indexes:
+
+    domain  -> email ids   every URL host and each of its parent domains
+                           ("a.evil.com" is filed under "a.evil.com" and
+                           "evil.com"), like the blocklist lookup
+    keyword -> email ids   content_analysis["matched_keywords"]
+
+`apply(delta)` re-classifies only the emails a `RuleDelta` can affect:
+
+  - added / removed domains: the emails filed under those domains get a
+    new url_check_result; the content is only analyzed for emails that
+    were dangerous and no longer are;
+  - added / removed keywords: every email with at least one match (the
+    score is matched / total, so the total matters too), plus the emails
+    matching an added keyword. They are found by scanning the analyzed
+    emails for the added keywords only; the other keywords are re-used
+    from matched_keywords, not scanned again;
+  - a keyword whose number of occurrences in the list changes (e.g. a
+    duplicate added): `RuleDelta.between` sets rescan_keywords and every
+    analyzed email is scanned again.
+
+The stored results become exactly what the graph would now return, and
+each email whose threat_level changes is yielded as a change event:
+
+    {"email_id": ..., "previous_threat_level": "safe",
+     "threat_level": "dangerous", "response": "ALERT: ..."}
+
+Results should come from the automatic graph: a human verdict recorded
+by the HITL graph is overwritten if the email is re-classified.
+
+Usage:
+
+    index = ReclassificationIndex(classify_batch(mailbox))
+
+    mock_data.URL_BLOCKLIST.add("newly-bad.com")
+    invalidate_index()
+    for change in index.apply(RuleDelta(added_domains={"newly-bad.com"})):
+        notify(change)
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+
+from email_classifier.blocklist import extract_host, get_index
+from email_classifier.keywords import KeywordAutomaton, get_automaton, make_analysis
+from email_classifier.nodes import generate_response
+from email_classifier.state import EmailState
+
+
+@dataclass(frozen=True)
+class RuleDelta:
+    """Rule changes between the classification of the results and now."""
+
+    added_domains: frozenset = frozenset()
+    removed_domains: frozenset = frozenset()
+    added_keywords: tuple = ()
+    removed_keywords: tuple = ()
+    # Some keyword's number of occurrences in the list changed (a duplicate
+    # added or removed): every analyzed email is scanned again.
+    rescan_keywords: bool = False
+
+    @classmethod
+    def between(cls, old_domains=(), new_domains=(), old_keywords=(), new_keywords=()) -> "RuleDelta":
+        """Delta from one blocklist / keyword list to another.
+
+        Keywords are compared as multisets: the list length is the score's
+        denominator, so a duplicate counts as a change.
+        """
+        old_domains, new_domains = frozenset(old_domains), frozenset(new_domains)
+        old_counts, new_counts = Counter(old_keywords), Counter(new_keywords)
+        return cls(
+            added_domains=new_domains - old_domains,
+            removed_domains=old_domains - new_domains,
+            added_keywords=tuple(kw for kw in new_keywords if kw not in old_counts),
+            removed_keywords=tuple(kw for kw in old_keywords if kw not in new_counts),
+            rescan_keywords=any(
+                old_counts[kw] != count for kw, count in new_counts.items() if kw in old_counts
+            ),
+        )
+
+    @property
+    def keywords_changed(self) -> bool:
+        return bool(self.added_keywords or self.removed_keywords or self.rescan_keywords)
+
+
+def _parent_domains(host: str):
+    """`host` and its parent domains with at least two labels."""
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        yield ".".join(labels[i:])
+
+
+def _text(result: dict) -> str:
+    return (result.get("subject", "") + " " + result.get("body", "")).lower()
+
+
+class ReclassificationIndex:
+    """Past results indexed by URL domain and matched keyword.
+
+    Args:
+        results: Result dicts carrying "email_id" (graph outputs or
+                 classify_batch results), with the subject and body the
+                 content analysis needs.
+    """
+
+    def __init__(self, results=()):
+        self._results: dict[str, dict] = {}
+        self._by_domain: dict[str, set[str]] = {}
+        self._by_keyword: dict[str, set[str]] = {}
+        self.update(results)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, email_id: str) -> bool:
+        return email_id in self._results
+
+    def get(self, email_id: str) -> dict | None:
+        return self._results.get(email_id)
+
+    def results(self):
+        """Every stored result, in insertion order."""
+        return iter(self._results.values())
+
+    # ---------- Indexing ----------
+
+    def _postings(self, result: dict):
+        for url in result.get("urls", ()):
+            for domain in _parent_domains(extract_host(url)):
+                yield self._by_domain, domain
+        for keyword in (result.get("content_analysis") or {}).get("matched_keywords", ()):
+            yield self._by_keyword, keyword
+
+    def _unindex(self, email_id: str) -> None:
+        old = self._results.get(email_id)
+        if old is None:
+            return
+        for postings, key in self._postings(old):
+            ids = postings.get(key)
+            if ids is not None:
+                ids.discard(email_id)
+                if not ids:
+                    del postings[key]
+
+    def _move_keywords(self, email_id: str, old: dict, new: dict) -> None:
+        before = (old.get("content_analysis") or {}).get("matched_keywords", ())
+        after = (new.get("content_analysis") or {}).get("matched_keywords", ())
+        if before == after:
+            return
+        for keyword in set(before) - set(after):
+            ids = self._by_keyword[keyword]
+            ids.discard(email_id)
+            if not ids:
+                del self._by_keyword[keyword]
+        for keyword in set(after) - set(before):
+            self._by_keyword.setdefault(keyword, set()).add(email_id)
+
+    def add(self, result: dict) -> None:
+        """Store (or replace) the result of one email."""
+        email_id = result.get("email_id")
+        if not email_id:
+            raise ValueError("results need an email_id to be indexed")
+        self._unindex(email_id)
+        self._results[email_id] = result
+        for postings, key in self._postings(result):
+            postings.setdefault(key, set()).add(email_id)
+
+    def update(self, results) -> None:
+        for result in results:
+            self.add(result)
+
+    def emails_for_domain(self, domain: str) -> set[str]:
+        """Ids of the emails with a URL on `domain` or one of its subdomains."""
+        return set(self._by_domain.get(domain, ()))
+
+    def emails_for_keyword(self, keyword: str) -> set[str]:
+        """Ids of the emails whose content analysis matched `keyword`."""
+        return set(self._by_keyword.get(keyword, ()))
+
+    # ---------- Re-classification ----------
+
+    def affected(self, delta: RuleDelta, added_matches: dict | None = None) -> set[str]:
+        """Ids of the emails `delta` may re-classify.
+
+        Args:
+            added_matches: email id -> added keywords it contains (see
+                           `apply`); only needed for keyword additions.
+        """
+        affected = set()
+        for domain in delta.added_domains | delta.removed_domains:
+            affected |= self._by_domain.get(domain, set())
+        if delta.rescan_keywords:
+            affected.update(
+                email_id for email_id, result in self._results.items()
+                if result.get("content_analysis") is not None
+            )
+        elif delta.keywords_changed:
+            for ids in self._by_keyword.values():
+                affected |= ids
+            affected.update(added_matches or ())
+            affected.update(
+                email_id for email_id, result in self._results.items()
+                if (result.get("content_analysis") or {}).get("partial")
+            )
+        return affected
+
+    def _scan_added(self, keywords) -> dict[str, list[str]]:
+        """Analyzed emails containing any of the added `keywords`."""
+        automaton = KeywordAutomaton(list(keywords))
+        found = {}
+        for email_id, result in self._results.items():
+            if result.get("content_analysis") is not None:
+                matched = automaton.match(_text(result))
+                if matched:
+                    found[email_id] = matched
+        return found
+
+    def apply(self, delta: RuleDelta, index=None, keywords=None):
+        """Re-classify the emails affected by `delta` with the current rules.
+
+        Args:
+            delta: What changed since the stored results were produced.
+            index: Blocklist index to check with (default: `get_index()`).
+            keywords: Keyword list to analyze with (default: the pinned rule
+                      set, or SPAM_KEYWORDS).
+
+        Yields:
+            One change event per email whose threat_level changes, in
+            email id order. The stored results are updated as the stream
+            is consumed.
+        """
+        if index is None:
+            index = get_index()
+        automaton = get_automaton(keywords)
+        keywords = automaton.keywords
+        if delta.added_keywords and not delta.rescan_keywords:
+            added_matches = self._scan_added(delta.added_keywords)
+        else:
+            added_matches = {}
+        added = set(delta.added_keywords)
+        url_affected = set()
+        for domain in delta.added_domains | delta.removed_domains:
+            url_affected |= self._by_domain.get(domain, set())
+
+        responses: dict[str, str] = {}
+        for email_id in sorted(self.affected(delta, added_matches)):
+            old = self._results[email_id]
+            result = dict(old)
+
+            url_result = old.get("url_check_result")
+            if url_result is None or email_id in url_affected:
+                url_result = index.check_urls(old.get("urls", []))
+            result["url_check_result"] = url_result
+
+            if not url_result["safe"]:
+                result.pop("content_analysis", None)
+                level = "dangerous"
+            else:
+                analysis = old.get("content_analysis")
+                if analysis is None or analysis.get("partial") or delta.rescan_keywords:
+                    matched = automaton.match(_text(old))
+                elif delta.keywords_changed:
+                    previous = set(analysis["matched_keywords"])
+                    new = set(added_matches.get(email_id, ()))
+                    matched = [kw for kw in keywords if (kw in new if kw in added else kw in previous)]
+                else:
+                    matched = None
+                if matched is not None:
+                    analysis = make_analysis(matched, len(keywords))
+                result["content_analysis"] = analysis
+                level = "suspicious" if analysis["is_suspicious"] else "safe"
+
+            if level not in responses:
+                responses[level] = generate_response(EmailState(threat_level=level))["response"]
+            result["threat_level"] = level
+            result["response"] = responses[level]
+            self._results[email_id] = result
+            # The URLs are unchanged: only the keyword postings can move.
+            self._move_keywords(email_id, old, result)
+
+            if level != old.get("threat_level"):
+                yield {
+                    "email_id": email_id,
+                    "previous_threat_level": old.get("threat_level", ""),
+                    "threat_level": level,
+                    "response": result["response"],
+                }
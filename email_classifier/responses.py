@@ -0,0 +1,148 @@
+"""
+Interned response templates
+===========================
+
+`generate_response` writes one of three fixed messages into every final
+state, and every HITL checkpoint after it stores its own copy, although the
+message is fully determined by threat_level. With
+`build_pipeline(lazy_responses=True)` the graph stores no response at all:
+
+  - threat_level is the verdict code. It is already in the state, so the
+    response costs no state or checkpoint space;
+  - `ResponseTemplates` holds one interned template per threat level;
+    `render(result)` builds the text when a consumer asks for it, and
+    `view(result)` wraps a result so that reading result["response"]
+    renders it;
+  - templates may use per-email details, read from the result at render
+    time: {flagged_urls}, {flagged_count}, {matched_keywords},
+    {spam_score}, {email_id}, {sender}, {subject}, {threat_level}.
+    A template without fields is returned as the interned string itself.
+
+`DEFAULT_TEMPLATES` renders exactly the generate_response messages.
+
+Usage:
+
+    graph = build_pipeline(lazy_responses=True)
+    result = graph.invoke(email)                 # no "response" stored
+    text = default_templates().render(result)
+
+    templates = ResponseTemplates({
+        **DEFAULT_TEMPLATES,
+        "dangerous": "ALERT: blocked URL(s) {flagged_urls}. Do not interact with it.",
+    })
+    for result in map(templates.view, classify_batch(emails, lazy_responses=True)):
+        print(result["response"])
+"""
+
+import string
+import sys
+from collections.abc import Mapping
+
+from email_classifier.nodes import RESPONSES
+
+
+# The generate_response messages (none of them contains a format field).
+DEFAULT_TEMPLATES = dict(RESPONSES)
+
+FIELDS = (
+    "flagged_urls", "flagged_count", "matched_keywords", "spam_score",
+    "email_id", "sender", "subject", "threat_level",
+)
+
+
+def _get(result, name: str, default=None):
+    if isinstance(result, Mapping):
+        return result.get(name, default)
+    return getattr(result, name, default)
+
+
+def _details(result) -> dict:
+    url_check = _get(result, "url_check_result") or {}
+    analysis = _get(result, "content_analysis") or {}
+    flagged = url_check.get("flagged_urls", [])
+    return {
+        "flagged_urls": ", ".join(flagged),
+        "flagged_count": len(flagged),
+        "matched_keywords": ", ".join(analysis.get("matched_keywords", [])),
+        "spam_score": analysis.get("spam_score", 0.0),
+        "email_id": _get(result, "email_id", ""),
+        "sender": _get(result, "sender", ""),
+        "subject": _get(result, "subject", ""),
+        "threat_level": _get(result, "threat_level", ""),
+    }
+
+
+class ResponseTemplates:
+    """One interned template per threat level.
+
+    Args:
+        templates: threat_level -> template (str.format fields from FIELDS);
+                   default: DEFAULT_TEMPLATES.
+        default: Template for any other threat_level ("" like
+                 generate_response).
+    """
+
+    def __init__(self, templates: dict[str, str] | None = None, default: str = ""):
+        if templates is None:
+            templates = DEFAULT_TEMPLATES
+        self._templates: dict[str, tuple[str, bool]] = {}
+        for level, template in templates.items():
+            fields = {name for _, name, _, _ in string.Formatter().parse(template) if name is not None}
+            unknown = fields - set(FIELDS)
+            if unknown:
+                raise ValueError(f"unknown template field(s) {sorted(unknown)} for {level!r}")
+            self._templates[sys.intern(level)] = (sys.intern(template), bool(fields))
+        self.default = sys.intern(default)
+
+    def template(self, threat_level: str) -> str:
+        entry = self._templates.get(threat_level)
+        return entry[0] if entry is not None else self.default
+
+    def render(self, result) -> str:
+        """The response text of a result dict or state object."""
+        entry = self._templates.get(_get(result, "threat_level", ""))
+        if entry is None:
+            return self.default
+        template, has_fields = entry
+        return template.format(**_details(result)) if has_fields else template
+
+    def view(self, result: dict) -> "ResultView":
+        return ResultView(result, self)
+
+
+class ResultView(Mapping):
+    """Read-only view of a result whose "response" is rendered on access."""
+
+    __slots__ = ("_result", "_templates")
+
+    def __init__(self, result: dict, templates: ResponseTemplates):
+        self._result = result
+        self._templates = templates
+
+    def __getitem__(self, key):
+        if key == "response":
+            return self._templates.render(self._result)
+        return self._result[key]
+
+    def __iter__(self):
+        yield from self._result
+        if "response" not in self._result:
+            yield "response"
+
+    def __len__(self) -> int:
+        return len(self._result) + ("response" not in self._result)
+
+
+_default_templates = ResponseTemplates()
+
+
+def default_templates() -> ResponseTemplates:
+    return _default_templates
+
+
+# ---------- Graph node ----------
+
+def defer_response(state) -> dict:
+    """generate_response for lazy_responses graphs: the response is left out
+    of the state and rendered from threat_level when it is read."""
+    return {}
@@ -0,0 +1,175 @@
+"""
+Bulk human review
+=================
+
+`checks.check_hitl_interrupt` resumes a paused thread one at a time:
+
+    hitl_graph.update_state(config, {"threat_level": "safe"})
+    hitl_graph.invoke(None, config)
+
+Analysts triage whole campaigns at once. `ReviewQueue` wraps a graph from
+`build_hitl_graph()` and works on many threads in one call:
+
+  - `pending()` lists every thread paused before human_review. With a
+    SqliteCheckpointSaver this is a single indexed query; other
+    checkpointers fall back to the thread ids the queue has seen.
+  - `resume(decisions)` applies a batch of threat_level overrides and
+    resumes the affected threads concurrently, reporting one outcome per
+    thread instead of stopping at the first failure.
+
+Usage:
+
+    queue = ReviewQueue(hitl_graph)
+    for thread_id, email in emails:
+        queue.submit(email, thread_id)
+    outcomes = queue.resume({tid: "safe" for tid in queue.pending()})
+
+With a `build_pipeline(hitl=True, decision_only=True)` graph the paused
+threads only carry a partial content_analysis; `details(thread_id)`
+completes it when a reviewer opens the thread.
+
+With a `build_pipeline(hitl=True, lazy_responses=True)` graph the threads
+store no response: each ReviewOutcome's response is rendered from its
+threat_level with the queue's response templates.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from email_classifier.keywords import complete_analysis
+from email_classifier.lean_state import default_body_store
+from email_classifier.responses import ResponseTemplates, default_templates
+
+
+REVIEW_NODE = "human_review"
+VALID_LEVELS = ("safe", "suspicious", "dangerous")
+DEFAULT_CONCURRENCY = 64
+
+
+@dataclass
+class ReviewOutcome:
+    """Result of resuming one thread."""
+
+    thread_id: str
+    ok: bool
+    threat_level: str = ""
+    response: str = ""
+    error: str = ""
+
+
+class ReviewQueue:
+    """Bulk operations on the threads paused at human_review.
+
+    Args:
+        graph: A compiled graph from `build_hitl_graph()`.
+        concurrency: Maximum number of threads resumed at the same time.
+        templates: ResponseTemplates rendering the outcomes' response when
+                   the graph stores none (default: `default_templates()`).
+    """
+
+    def __init__(
+        self,
+        graph,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        templates: ResponseTemplates | None = None,
+    ):
+        self.graph = graph
+        self.concurrency = concurrency
+        self.templates = templates if templates is not None else default_templates()
+        self._known: dict[str, None] = {}  # insertion-ordered set of thread ids
+
+    @staticmethod
+    def config(thread_id: str) -> dict:
+        return {"configurable": {"thread_id": thread_id}}
+
+    # ---------- Intake ----------
+
+    def submit(self, email: dict, thread_id: str) -> dict:
+        """Run one email until it finishes or pauses for review."""
+        self._known[thread_id] = None
+        return self.graph.invoke(email, self.config(thread_id))
+
+    # ---------- Listing ----------
+
+    def pending(self) -> list[str]:
+        """Thread ids currently paused before human_review."""
+        saver = self.graph.checkpointer
+        if hasattr(saver, "thread_ids"):
+            return saver.thread_ids(waiting_on=REVIEW_NODE)
+        return [
+            thread_id for thread_id in self._known
+            if REVIEW_NODE in self.graph.get_state(self.config(thread_id)).next
+        ]
+
+    def details(self, thread_id: str) -> dict | None:
+        """Full content_analysis of a thread.
+
+        A partial (decision-only) analysis is completed from the thread's
+        subject and body and written back to the thread, so it is computed
+        at most once.
+        """
+        config = self.config(thread_id)
+        values = self.graph.get_state(config).values
+        analysis = values.get("content_analysis")
+        if analysis is None or not analysis.get("partial"):
+            return analysis
+        body = values["body"] if "body" in values else default_body_store().get(values.get("body_ref", ""))
+        analysis = complete_analysis(analysis, values.get("subject", ""), body)
+        self.graph.update_state(config, {"content_analysis": analysis})
+        return analysis
+
+    # ---------- Resuming ----------
+
+    async def _resume_one(self, thread_id: str, threat_level: str | None, slots) -> ReviewOutcome:
+        async with slots:
+            try:
+                if threat_level is not None and threat_level not in VALID_LEVELS:
+                    raise ValueError(f"invalid threat_level {threat_level!r}")
+                config = self.config(thread_id)
+                snapshot = await self.graph.aget_state(config)
+                if REVIEW_NODE not in snapshot.next:
+                    raise LookupError("thread is not waiting for human review")
+                if threat_level is not None:
+                    await self.graph.aupdate_state(config, {"threat_level": threat_level})
+                result = await self.graph.ainvoke(None, config)
+            except Exception as exc:
+                return ReviewOutcome(thread_id, ok=False, error=f"{type(exc).__name__}: {exc}")
+        return ReviewOutcome(
+            thread_id,
+            ok=True,
+            threat_level=result.get("threat_level", ""),
+            response=result["response"] if "response" in result else self.templates.render(result),
+        )
+
+    async def aresume(self, decisions: dict) -> list[ReviewOutcome]:
+        """Async version of `resume`."""
+        slots = asyncio.Semaphore(self.concurrency)
+        return list(await asyncio.gather(*(
+            self._resume_one(thread_id, level, slots) for thread_id, level in decisions.items()
+        )))
+
+    def resume(self, decisions: dict) -> list[ReviewOutcome]:
+        """Apply threat_level overrides and resume the threads concurrently.
+
+        Args:
+            decisions: {thread_id: threat_level}. A threat_level of None
+                       resumes the thread without overriding it.
+
+        Returns:
+            One ReviewOutcome per thread, in the order of `decisions`.
+
+        Called from a running event loop (e.g. a notebook cell), the resumes
+        run on a worker thread with their own loop and the call blocks until
+        they are done; `await aresume(...)` avoids blocking the loop.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aresume(decisions))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.aresume(decisions)).result()
+
+    def approve_all(self, threat_level: str | None = None) -> list[ReviewOutcome]:
+        """Resume every pending thread with the same verdict."""
+        return self.resume({thread_id: threat_level for thread_id in self.pending()})
@@ -0,0 +1,333 @@
+"""
+Versioned rule store
+====================
+
+URL_BLOCKLIST and SPAM_KEYWORDS are module constants: changing them means
+reloading mock_data or restarting the process. `RuleStore` instead loads
+the rules from a directory:
+
+    rules/
+      blocklist.txt   -- one reversed domain per line (BlocklistIndex.save),
+                         or blocklist.txt.gz, or blocklist.bin (a compact
+                         table, memory-mapped -- see mmap_blocklist.py)
+      keywords.json   -- JSON list of keywords
+
+Each load produces an immutable `RuleSet` (compiled blocklist index +
+keyword automaton) whose version is a hash of the file contents. Reloads
+build the new RuleSet completely -- in the background thread started by
+`start()`, or in whichever thread calls `reload()` -- and then swap it in
+with a single reference assignment, so lookups never wait on a rebuild.
+A failed reload (e.g. a half-written file) keeps the current rules and is
+reported in `last_error`.
+
+Graphs built with `build_pipeline(rules=store)` pin one RuleSet per email:
+check_urls takes the current one and records its version in
+url_check_result["rule_version"]; analyze_content runs against that same
+version (kept around for the last few swaps) and records it in
+content_analysis["rule_version"]. An invoke in flight during a swap thus
+finishes on the rules it started with.
+
+Publish updates atomically (write to a temporary file and `os.replace` it,
+or switch a symlinked directory) so a reload never reads a partial file.
+
+Usage:
+
+    store = RuleStore("/etc/email_classifier/rules", poll_interval=5.0)
+    graph = build_pipeline(rules=store)
+    result = graph.invoke(email)
+    result["url_check_result"]["rule_version"]
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from email_classifier import mock_data
+from email_classifier import blocklist as blocklist_module
+from email_classifier import keywords as keywords_module
+from email_classifier.blocklist import BlocklistIndex
+from email_classifier.keywords import KeywordAutomaton
+from email_classifier.mmap_blocklist import MappedBlocklist, build_compact_blocklist
+from email_classifier.prefilter import PrefilteredBlocklist
+
+
+BLOCKLIST_FILE = "blocklist.txt"
+COMPACT_BLOCKLIST_FILE = "blocklist.bin"
+KEYWORDS_FILE = "keywords.json"
+DEFAULT_KEEP_VERSIONS = 4
+
+# State field each rule-dependent node writes its result to.
+_RESULT_FIELDS = {
+    "check_urls": "url_check_result",
+    "analyze_content": "content_analysis",
+}
+
+
+# ---------- Rule files ----------
+
+def write_rules(rules_dir: str, blocklist=None, keywords=None, compact: bool = False) -> None:
+    """Write a rules directory (default: URL_BLOCKLIST, SPAM_KEYWORDS).
+
+    Each file is written to a temporary name and then renamed, so a
+    RuleStore watching the directory never sees a partial file.
+
+    Args:
+        rules_dir: The rules directory (created if missing).
+        blocklist: Domains to block.
+        keywords: Spam keywords.
+        compact: Write the blocklist as blocklist.bin (see mmap_blocklist.py),
+                 which loaders map instead of building a trie, instead of
+                 blocklist.txt.
+    """
+    if blocklist is None:
+        blocklist = mock_data.URL_BLOCKLIST
+    if keywords is None:
+        keywords = mock_data.SPAM_KEYWORDS
+    os.makedirs(rules_dir, exist_ok=True)
+
+    compact_path = os.path.join(rules_dir, COMPACT_BLOCKLIST_FILE)
+    if compact:
+        build_compact_blocklist(blocklist, compact_path + ".tmp")
+        os.replace(compact_path + ".tmp", compact_path)
+    else:
+        path = os.path.join(rules_dir, BLOCKLIST_FILE)
+        BlocklistIndex(blocklist).save(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        # blocklist.bin takes precedence when loading: drop a stale one.
+        if os.path.exists(compact_path):
+            os.remove(compact_path)
+
+    path = os.path.join(rules_dir, KEYWORDS_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(list(keywords), f)
+    os.replace(path + ".tmp", path)
+
+
+def _blocklist_path(rules_dir: str) -> str:
+    """blocklist.bin if present, else blocklist.txt (or blocklist.txt.gz)."""
+    compact = os.path.join(rules_dir, COMPACT_BLOCKLIST_FILE)
+    if os.path.exists(compact):
+        return compact
+    path = os.path.join(rules_dir, BLOCKLIST_FILE)
+    if not os.path.exists(path) and os.path.exists(path + ".gz"):
+        return path + ".gz"
+    return path
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """One immutable, compiled version of the rules."""
+
+    version: str
+    index: BlocklistIndex | MappedBlocklist | PrefilteredBlocklist
+    automaton: KeywordAutomaton
+
+
+def load_rules(rules_dir: str, prefilter_fp_rate: float | None = None) -> RuleSet:
+    """Load and compile a rules directory.
+
+    Args:
+        rules_dir: The rules directory.
+        prefilter_fp_rate: If set, put a Bloom pre-filter with this
+            false-positive rate in front of the blocklist (see prefilter.py).
+    """
+    blocklist_path = _blocklist_path(rules_dir)
+    if blocklist_path.endswith(".bin"):
+        # Map, don't read: the table's own checksum stands in for its bytes.
+        index = MappedBlocklist(blocklist_path)
+        blocklist_data = bytes.fromhex(index.checksum)
+    else:
+        blocklist_data = _read(blocklist_path)
+    keywords_data = _read(os.path.join(rules_dir, KEYWORDS_FILE))
+
+    h = hashlib.blake2b(digest_size=8)
+    for data in (blocklist_data, keywords_data):
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+
+    if not blocklist_path.endswith(".bin"):
+        if blocklist_path.endswith(".gz"):
+            blocklist_data = gzip.decompress(blocklist_data)
+        index = BlocklistIndex.from_reversed(blocklist_data.decode("utf-8").splitlines())
+    if prefilter_fp_rate is not None:
+        index = PrefilteredBlocklist(index, prefilter_fp_rate)
+    keywords = json.loads(keywords_data)
+    if not isinstance(keywords, list) or not all(isinstance(kw, str) for kw in keywords):
+        raise ValueError(f"{KEYWORDS_FILE} must hold a JSON list of strings")
+    return RuleSet(h.hexdigest(), index, KeywordAutomaton(keywords))
+
+
+@contextmanager
+def use_rules(ruleset: RuleSet):
+    """Make `ruleset` the default rules of get_index() / get_automaton()
+    (and therefore of every analyzer) in the current context."""
+    index_token = blocklist_module._active_index.set(ruleset.index)
+    automaton_token = keywords_module._active_automaton.set(ruleset.automaton)
+    try:
+        yield ruleset
+    finally:
+        keywords_module._active_automaton.reset(automaton_token)
+        blocklist_module._active_index.reset(index_token)
+
+
+# ---------- Store ----------
+
+class RuleStore:
+    """Hot-reloadable rules loaded from a directory.
+
+    Args:
+        rules_dir: Directory holding blocklist.bin / blocklist.txt[.gz] and
+                   keywords.json.
+        poll_interval: If set, start a background thread that checks the
+                       files every `poll_interval` seconds.
+        keep_versions: How many recent RuleSets stay reachable by version
+                       (for emails that started on an older version).
+        prefilter_fp_rate: If set, every RuleSet's blocklist gets a Bloom
+                           pre-filter with this false-positive rate.
+    """
+
+    def __init__(
+        self,
+        rules_dir: str,
+        poll_interval: float | None = None,
+        keep_versions: int = DEFAULT_KEEP_VERSIONS,
+        prefilter_fp_rate: float | None = None,
+    ):
+        self.rules_dir = rules_dir
+        self.keep_versions = keep_versions
+        self.prefilter_fp_rate = prefilter_fp_rate
+        self.last_error: Exception | None = None
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+        self._versions: OrderedDict[str, RuleSet] = OrderedDict()
+        self._signature = self._file_signature()
+        self._current = self._publish(load_rules(rules_dir, prefilter_fp_rate))
+        self._stop = threading.Event()
+        self._thread = None
+        if poll_interval:
+            self.start(poll_interval)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # ---------- Lookups (hot path, lock-free) ----------
+
+    @property
+    def version(self) -> str:
+        return self._current.version
+
+    def current(self) -> RuleSet:
+        """The active RuleSet."""
+        return self._current
+
+    def get(self, version: str | None) -> RuleSet | None:
+        """A recent RuleSet by version, or None if unknown or evicted."""
+        if version is None:
+            return None
+        return self._versions.get(version)
+
+    # ---------- Reloading ----------
+
+    def _file_signature(self) -> tuple:
+        signature = []
+        for path in (_blocklist_path(self.rules_dir), os.path.join(self.rules_dir, KEYWORDS_FILE)):
+            try:
+                st = os.stat(path)
+                signature.append((path, st.st_ino, st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append((path, None))
+        return tuple(signature)
+
+    def _publish(self, ruleset: RuleSet) -> RuleSet:
+        versions = self._versions.copy()
+        versions[ruleset.version] = ruleset
+        versions.move_to_end(ruleset.version)
+        while len(versions) > self.keep_versions:
+            versions.popitem(last=False)
+        self._versions = versions
+        return ruleset
+
+    def reload(self, force: bool = False) -> bool:
+        """Reload the rules if the files changed.
+
+        The new RuleSet is built before anything is swapped; readers keep
+        using the current one meanwhile.
+
+        Returns:
+            True if a new version was installed.
+        """
+        with self._reload_lock:
+            signature = self._file_signature()
+            if not force and signature == self._signature:
+                return False
+            ruleset = load_rules(self.rules_dir, self.prefilter_fp_rate)
+            self._signature = signature
+            if ruleset.version == self._current.version:
+                return False
+            self._current = self._publish(ruleset)
+            self.reloads += 1
+            return True
+
+    def start(self, poll_interval: float) -> None:
+        """Poll the rules directory in a daemon thread."""
+        if self._thread is not None:
+            return
+
+        def poll():
+            while not self._stop.wait(poll_interval):
+                try:
+                    self.reload()
+                    self.last_error = None
+                except Exception as exc:  # keep serving the current rules
+                    self.last_error = exc
+
+        self._thread = threading.Thread(target=poll, name="rule-store-reload", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the polling thread (if any)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
+
+    # ---------- Graph integration ----------
+
+    def wrap(self, name: str, node):
+        """Return `node` running on a pinned RuleSet (see build_pipeline).
+
+        check_urls pins the current version; later nodes reuse the version
+        recorded in url_check_result (falling back to the current one if
+        it has been evicted, e.g. after a restart). The version is added to
+        the node's result dict.
+        """
+        field = _RESULT_FIELDS.get(name)
+
+        def pinned(state):
+            ruleset = None
+            if name != "check_urls":
+                ruleset = self.get((getattr(state, "url_check_result", None) or {}).get("rule_version"))
+            if ruleset is None:
+                ruleset = self._current
+            with use_rules(ruleset):
+                result = node(state)
+            if field is not None and result.get(field) is not None:
+                result = {**result, field: {**result[field], "rule_version": ruleset.version}}
+            return result
+
+        pinned.__name__ = getattr(node, "__name__", name)
+        return pinned
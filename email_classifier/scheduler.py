@@ -0,0 +1,300 @@
+"""
+Priority review scheduler
+=========================
+
+Every thread paused before human_review looks the same to `ReviewQueue`.
+`ReviewScheduler` orders them, so that reviewers always get the most
+urgent one next:
+
+  - priority = score_weight * spam_score
+             + reputation_weight * (1 - sender reputation)
+             + age_weight * seconds waited
+    Every pending item ages at the same rate, so the age term is folded
+    into a fixed key (-age_weight * paused_at) and never needs re-keying.
+  - `pop_next()` removes and returns the top item in O(log n) from an
+    indexed binary heap, which also supports O(log n) removal by thread id.
+  - Threads waiting longer than `sla_seconds` are resumed with
+    `default_verdict` by `release_expired()` (call it periodically), using
+    a second heap ordered by pause time.
+
+Usage:
+
+    scheduler = ReviewScheduler(ReviewQueue(hitl_graph), sla_seconds=4 * 3600)
+    for thread_id, email in emails:
+        scheduler.submit(email, thread_id)
+
+    item = scheduler.pop_next()                # highest priority
+    scheduler.decide(item.thread_id, "safe")   # resume with the verdict
+    scheduler.release_expired()                # SLA auto-release
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import count
+
+from email_classifier.review import REVIEW_NODE, ReviewOutcome, ReviewQueue
+
+
+DEFAULT_REPUTATION = 0.5
+
+
+# ---------- Indexed priority queue ----------
+
+class IndexedPriorityQueue:
+    """Binary min-heap with a key -> position index.
+
+    push / pop / remove / update are O(log n); equal priorities come out in
+    insertion order.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple] = []  # (priority, seq, key); seq is unique
+        self._pos: dict = {}
+        self._seq = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, key) -> bool:
+        return key in self._pos
+
+    def priority(self, key):
+        return self._heap[self._pos[key]][0]
+
+    def push(self, key, priority) -> None:
+        """Insert `key`, or change its priority if already queued."""
+        if key in self._pos:
+            i = self._pos[key]
+            old, seq, _ = self._heap[i]
+            self._heap[i] = (priority, seq, key)
+            if priority < old:
+                self._sift_up(i)
+            else:
+                self._sift_down(i)
+            return
+        self._heap.append((priority, next(self._seq), key))
+        self._pos[key] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def peek(self):
+        """(key, priority) of the smallest entry, without removing it."""
+        priority, _, key = self._heap[0]
+        return key, priority
+
+    def pop(self):
+        """Remove and return (key, priority) of the smallest entry."""
+        key, priority = self.peek()
+        self._remove_at(0)
+        return key, priority
+
+    def remove(self, key):
+        """Remove `key`; returns its priority."""
+        i = self._pos[key]
+        priority = self._heap[i][0]
+        self._remove_at(i)
+        return priority
+
+    def _remove_at(self, i: int) -> None:
+        heap = self._heap
+        last = heap.pop()
+        del self._pos[heap[i][2] if i < len(heap) else last[2]]
+        if i < len(heap):
+            heap[i] = last
+            self._pos[last[2]] = i
+            self._sift_up(i)
+            self._sift_down(self._pos[last[2]])
+
+    def _sift_up(self, i: int) -> None:
+        heap, pos = self._heap, self._pos
+        entry = heap[i]
+        while i:
+            parent = (i - 1) >> 1
+            if heap[parent] < entry:
+                break
+            heap[i] = heap[parent]
+            pos[heap[i][2]] = i
+            i = parent
+        heap[i] = entry
+        pos[entry[2]] = i
+
+    def _sift_down(self, i: int) -> None:
+        heap, pos = self._heap, self._pos
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            if entry < heap[child]:
+                break
+            heap[i] = heap[child]
+            pos[heap[i][2]] = i
+            i = child
+        heap[i] = entry
+        pos[entry[2]] = i
+
+
+# ---------- Scheduler ----------
+
+@dataclass
+class ReviewItem:
+    """A thread waiting for human review."""
+
+    thread_id: str
+    spam_score: float
+    sender: str
+    reputation: float
+    paused_at: float  # time.time() when the thread paused
+
+
+class ReviewScheduler:
+    """Priority ordering and SLA auto-release for threads paused at human_review.
+
+    Args:
+        queue: The ReviewQueue (or HITL graph) the threads run on.
+        sla_seconds: Maximum wait before `release_expired` resumes a thread
+                     with `default_verdict` (None: no SLA).
+        default_verdict: threat_level applied on SLA release.
+        reputation: Callable sender -> reputation in [0, 1] (1 = trusted);
+                    default: every sender scores DEFAULT_REPUTATION.
+        score_weight, reputation_weight, age_weight: Priority weights
+                    (age_weight is per second waited).
+    """
+
+    def __init__(
+        self,
+        queue,
+        sla_seconds: float | None = None,
+        default_verdict: str = "suspicious",
+        reputation=None,
+        score_weight: float = 1.0,
+        reputation_weight: float = 0.5,
+        age_weight: float = 1 / 3600,
+    ):
+        self.queue = queue if isinstance(queue, ReviewQueue) else ReviewQueue(queue)
+        self.sla_seconds = sla_seconds
+        self.default_verdict = default_verdict
+        self.reputation = reputation
+        self.score_weight = score_weight
+        self.reputation_weight = reputation_weight
+        self.age_weight = age_weight
+        self._lock = threading.Lock()
+        self._items: dict[str, ReviewItem] = {}
+        self._by_priority = IndexedPriorityQueue()
+        self._by_age = IndexedPriorityQueue()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # ---------- Intake ----------
+
+    def _priority_key(self, item: ReviewItem) -> float:
+        # Min-heap key: the most urgent item has the smallest key.
+        urgency = self.score_weight * item.spam_score + self.reputation_weight * (1 - item.reputation)
+        return self.age_weight * item.paused_at - urgency
+
+    def add(self, thread_id: str, spam_score: float, sender: str = "", paused_at: float | None = None) -> ReviewItem:
+        """Queue a paused thread (or re-prioritize it if already queued)."""
+        reputation = self.reputation(sender) if self.reputation is not None else DEFAULT_REPUTATION
+        item = ReviewItem(thread_id, spam_score, sender, reputation, time.time() if paused_at is None else paused_at)
+        with self._lock:
+            self._items[thread_id] = item
+            self._by_priority.push(thread_id, self._priority_key(item))
+            self._by_age.push(thread_id, item.paused_at)
+        return item
+
+    def submit(self, email: dict, thread_id: str) -> dict:
+        """Run an email; queue it if it paused for review."""
+        result = self.queue.submit(email, thread_id)
+        # The thread's next nodes, not the result: lazy_responses graphs
+        # never store a response, paused or not.
+        if REVIEW_NODE in self.queue.graph.get_state(self.queue.config(thread_id)).next:
+            analysis = result.get("content_analysis") or {}
+            self.add(thread_id, analysis.get("spam_score", 0.0), result.get("sender", email.get("sender", "")))
+        return result
+
+    def load_pending(self) -> int:
+        """Queue every thread the checkpointer holds at human_review (e.g.
+        after a restart), using the checkpoint time as pause time."""
+        added = 0
+        for thread_id in self.queue.pending():
+            if thread_id in self._items:
+                continue
+            snapshot = self.queue.graph.get_state(self.queue.config(thread_id))
+            analysis = snapshot.values.get("content_analysis") or {}
+            paused_at = datetime.fromisoformat(snapshot.created_at).timestamp() if snapshot.created_at else None
+            self.add(thread_id, analysis.get("spam_score", 0.0), snapshot.values.get("sender", ""), paused_at)
+            added += 1
+        return added
+
+    # ---------- Reviewing ----------
+
+    def _discard(self, thread_id: str) -> ReviewItem | None:
+        item = self._items.pop(thread_id, None)
+        if item is not None:
+            self._by_priority.remove(thread_id)
+            self._by_age.remove(thread_id)
+        return item
+
+    def peek(self) -> ReviewItem | None:
+        """The top-priority item, left in the queue."""
+        with self._lock:
+            if not self._items:
+                return None
+            return self._items[self._by_priority.peek()[0]]
+
+    def pop_next(self) -> ReviewItem | None:
+        """Remove and return the top-priority item (O(log n))."""
+        with self._lock:
+            if not self._items:
+                return None
+            thread_id, _ = self._by_priority.pop()
+            self._by_age.remove(thread_id)
+            return self._items.pop(thread_id)
+
+    def _requeue(self, items: list[ReviewItem], outcomes: list[ReviewOutcome]) -> None:
+        # A failed resume leaves the thread where it was: put its item back
+        # (unless it was queued again meanwhile) so it is not lost.
+        with self._lock:
+            for item, outcome in zip(items, outcomes):
+                if not outcome.ok and item.thread_id not in self._items:
+                    self._items[item.thread_id] = item
+                    self._by_priority.push(item.thread_id, self._priority_key(item))
+                    self._by_age.push(item.thread_id, item.paused_at)
+
+    def decide(self, thread_id: str, threat_level: str | None) -> ReviewOutcome:
+        """Resume one thread with the reviewer's verdict.
+
+        If the resume fails (outcome.ok is False) the item stays queued.
+        """
+        with self._lock:
+            item = self._discard(thread_id)
+        outcome = self.queue.resume({thread_id: threat_level})[0]
+        if item is not None:
+            self._requeue([item], [outcome])
+        return outcome
+
+    def release_expired(self, now: float | None = None) -> list[ReviewOutcome]:
+        """Resume every thread past the SLA with `default_verdict`.
+
+        Threads whose resume fails stay queued (and are retried by the
+        next call).
+        """
+        if self.sla_seconds is None:
+            return []
+        cutoff = (time.time() if now is None else now) - self.sla_seconds
+        expired = []
+        with self._lock:
+            while self._by_age and self._by_age.peek()[1] <= cutoff:
+                thread_id, _ = self._by_age.pop()
+                self._by_priority.remove(thread_id)
+                expired.append(self._items.pop(thread_id))
+        if not expired:
+            return []
+        outcomes = self.queue.resume({item.thread_id: self.default_verdict for item in expired})
+        self._requeue(expired, outcomes)
+        return outcomes
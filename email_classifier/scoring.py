@@ -0,0 +1,207 @@
+"""
+Weighted scoring engine
+=======================
+
+`analyze_content_keywords` scores an email as matched / total keywords:
+every keyword added to SPAM_KEYWORDS dilutes all the others and shifts the
+0.15 threshold. `ScoringModel` scores with independent weights instead:
+
+  - rules: (pattern, weight, field), where field is "text" (subject + " " +
+    body, like the original analyzer), "subject", "body" or "sender";
+  - features: `attachment_weight` if the email has attachments, plus
+    `url_weight` per URL (counting at most `max_urls` URLs);
+  - score = sum of the weights of the matched rules and features;
+    is_suspicious = score >= threshold.
+
+The rules are compiled once into flat arrays: one keyword automaton per
+field (one pass over each field's text) and a weight array indexed by rule
+id. `score_batch` scores many emails at once; with NumPy installed, the
+weight sums, features and threshold are computed as vector operations.
+
+The result is a regular content_analysis dict ("spam_score" clamped to
+[0, 1], "matched_keywords", "is_suspicious"), so route_after_analysis and
+the rest of the graph work unchanged. `ScoringModel.uniform()` reproduces
+the original matched / total scoring exactly.
+
+Usage:
+
+    model = ScoringModel.load("scoring.json")
+    graph = build_pipeline(scoring=model)
+    results = classify_batch(emails, scoring=model)
+
+scoring.json:
+
+    {"threshold": 0.5, "attachment_weight": 0.1, "url_weight": 0.05, "max_urls": 4,
+     "rules": [{"pattern": "verify your identity", "weight": 0.4},
+               {"pattern": "urgent", "weight": 0.2, "field": "subject"}]}
+"""
+
+import json
+from array import array
+from dataclasses import asdict, dataclass
+
+try:
+    import numpy as np
+except ImportError:  # optional: only speeds up score_batch
+    np = None
+
+from email_classifier import mock_data
+from email_classifier.keywords import SUSPICIOUS_THRESHOLD, KeywordAutomaton
+
+
+FIELDS = ("text", "subject", "body", "sender")
+
+# Weight sums are compared with this tolerance, so that e.g. three rules of
+# weight 1/20 reach a 0.15 threshold exactly like 3 / 20 does.
+SCORE_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class ScoringRule:
+    """One weighted keyword rule."""
+
+    pattern: str
+    weight: float
+    field: str = "text"
+
+
+def _field_text(field: str, email: dict) -> str:
+    if field == "text":
+        return (email.get("subject", "") + " " + email.get("body", "")).lower()
+    return email.get(field, "").lower()
+
+
+class ScoringModel:
+    """Compiled weighted rules and features.
+
+    Args:
+        rules: ScoringRule objects (or dicts with the same keys).
+        threshold: Score from which an email is suspicious.
+        attachment_weight: Added when has_attachments is True.
+        url_weight: Added per URL.
+        max_urls: URLs beyond this count add nothing.
+    """
+
+    def __init__(
+        self,
+        rules,
+        threshold: float = SUSPICIOUS_THRESHOLD,
+        attachment_weight: float = 0.0,
+        url_weight: float = 0.0,
+        max_urls: int = 5,
+    ):
+        self.rules = [rule if isinstance(rule, ScoringRule) else ScoringRule(**rule) for rule in rules]
+        for rule in self.rules:
+            if rule.field not in FIELDS:
+                raise ValueError(f"unknown field {rule.field!r} (expected one of {FIELDS})")
+        self.threshold = threshold
+        self.attachment_weight = attachment_weight
+        self.url_weight = url_weight
+        self.max_urls = max_urls
+
+        # -- Flat arrays --
+        self.weights = array("d", (rule.weight for rule in self.rules))
+        self._np_weights = np.array(self.weights, dtype=np.float64) if np is not None else None
+        self.patterns = [rule.pattern for rule in self.rules]
+        # Per field: (field, automaton, rule ids of each automaton pattern id).
+        self._fields = []
+        for field in FIELDS:
+            rule_ids = [i for i, rule in enumerate(self.rules) if rule.field == field]
+            if not rule_ids:
+                continue
+            automaton = KeywordAutomaton([self.rules[i].pattern for i in rule_ids])
+            pattern_rules = [[] for _ in automaton.patterns]
+            for position, pid in enumerate(automaton._keyword_patterns):
+                pattern_rules[pid].append(rule_ids[position])
+            self._fields.append((field, automaton, tuple(map(tuple, pattern_rules))))
+
+    @classmethod
+    def uniform(cls, keywords: list[str] | None = None) -> "ScoringModel":
+        """The original scoring: every keyword weighs 1 / len(keywords)."""
+        if keywords is None:
+            keywords = mock_data.SPAM_KEYWORDS
+        weight = 1 / len(keywords) if keywords else 0.0
+        return cls([ScoringRule(kw, weight) for kw in keywords])
+
+    # ---------- Serialization ----------
+
+    def to_dict(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "attachment_weight": self.attachment_weight,
+            "url_weight": self.url_weight,
+            "max_urls": self.max_urls,
+            "rules": [asdict(rule) for rule in self.rules],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScoringModel":
+        return cls(**data)
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "ScoringModel":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    # ---------- Scoring ----------
+
+    def _features(self, urls, has_attachments) -> float:
+        return self.attachment_weight * bool(has_attachments) + self.url_weight * min(len(urls), self.max_urls)
+
+    def _analysis(self, rule_ids: list[int], raw: float) -> dict:
+        rule_ids.sort()
+        return {
+            "spam_score": round(min(max(raw, 0.0), 1.0), 3),
+            "matched_keywords": [self.patterns[i] for i in rule_ids],
+            "is_suspicious": raw >= self.threshold - SCORE_EPSILON,
+        }
+
+    def score(self, email: dict) -> dict:
+        """Score one email dict (MOCK_EMAILS shape).
+
+        Returns:
+            A content_analysis dict: "spam_score", "matched_keywords",
+            "is_suspicious".
+        """
+        rule_ids = []
+        for field, automaton, pattern_rules in self._fields:
+            for pid in automaton.find_patterns(_field_text(field, email)):
+                rule_ids.extend(pattern_rules[pid])
+        weights = self.weights
+        raw = sum(weights[i] for i in rule_ids)
+        raw += self._features(email.get("urls", ()), email.get("has_attachments", False))
+        return self._analysis(rule_ids, raw)
+
+    def score_batch(self, emails) -> list[dict]:
+        """Score many emails; same results as `score` for each one."""
+        emails = list(emails)
+        matched: list[list[int]] = [[] for _ in emails]
+        for field, automaton, pattern_rules in self._fields:
+            texts = (_field_text(field, email) for email in emails)
+            for row, found in enumerate(map(automaton.find_patterns, texts)):
+                for pid in found:
+                    matched[row].extend(pattern_rules[pid])
+
+        if np is None:
+            weights = self.weights
+            raw = [
+                sum(weights[i] for i in rule_ids)
+                + self._features(email.get("urls", ()), email.get("has_attachments", False))
+                for email, rule_ids in zip(emails, matched)
+            ]
+        else:
+            n = len(emails)
+            rows = np.repeat(np.arange(n), [len(rule_ids) for rule_ids in matched])
+            cols = np.fromiter((i for rule_ids in matched for i in rule_ids), dtype=np.intp, count=len(rows))
+            scores = np.bincount(rows, weights=self._np_weights[cols], minlength=n)
+            attachments = np.fromiter((bool(e.get("has_attachments", False)) for e in emails), dtype=bool, count=n)
+            url_counts = np.fromiter((len(e.get("urls", ())) for e in emails), dtype=np.int64, count=n)
+            scores += self.attachment_weight * attachments
+            scores += self.url_weight * np.minimum(url_counts, self.max_urls)
+            raw = scores.tolist()
+
+        return [self._analysis(rule_ids, r) for rule_ids, r in zip(matched, raw)]
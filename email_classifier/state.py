@@ -9,8 +9,7 @@ The state is defined as a Pydantic BaseModel. Each field has a type and a defaul
 value. When a node returns {"threat_level": "dangerous"}, LangGraph merges that
 into the current state, updating only that field.
 
-TODO: fill in the three missing fields marked below.
-Look at the existing fields for examples of how to declare them.
+Every node reads this schema; fields added here become state channels.
 """
 
 from typing import Optional
@@ -19,15 +18,15 @@ from pydantic import BaseModel, Field
 
 class EmailState(BaseModel):
     # -- Email metadata --
-    # TODO: declare email_id as a str with a default of ""
+    email_id: str = ""
     subject: str = ""
     body: str = ""
     sender: str = ""
     urls: list[str] = Field(default_factory=list)
-    # TODO: declare has_attachments as a bool with a default of False
+    has_attachments: bool = False
 
     # -- Analysis results (filled in by graph nodes) --
     url_check_result: Optional[dict] = None
-    # TODO: declare content_analysis as an Optional[dict] with a default of None
+    content_analysis: Optional[dict] = None
     threat_level: str = ""
     response: str = ""
@@ -0,0 +1,111 @@
+"""
+URL extraction and canonicalization
+===================================
+
+`check_urls` only sees `EmailState.urls`, which the caller has to fill in:
+links that only appear in the body are never checked. (Hosts themselves are
+taken from the URL authority and normalized with `normalize_host` by
+`blocklist.extract_host`, so "user@evil.com", "EVIL.com", "evil.com.",
+"bücher.evil.com" or "evil.com/go?next=https://good.com/" do not slip past
+the blocklist.)
+
+`build_pipeline(extract_urls=True)` runs an "extract_urls" node before
+check_urls that replaces `urls` with the canonical, deduplicated URLs of
+both `urls` and the body:
+
+  - one precompiled regex scans the body once, left to right, for
+    "scheme://..." and "www." links;
+  - the authority is reduced to its host: userinfo ("user:pw@") and port
+    (":8080") are dropped;
+  - the host is lower-cased, its trailing dot removed, and IDN labels
+    converted to punycode ("xn--bcher-kva.evil.com");
+  - duplicates are dropped, keeping the first occurrence.
+
+A body with thousands of links usually points at a handful of hosts:
+`normalize_host` keeps an LRU cache of HOST_CACHE_SIZE hosts, so each
+distinct host is normalized once.
+
+Usage:
+
+    from email_classifier.urls import canonicalize_url, find_urls
+    find_urls("Log in at HTTPS://User@Bücher.Example.COM.:443/login.")
+    # -> ["https://xn--bcher-kva.example.com/login"]
+
+    graph = build_pipeline(extract_urls=True)
+"""
+
+import functools
+import re
+
+from email_classifier.state import EmailState
+
+
+HOST_CACHE_SIZE = 65_536
+
+_URL_PATTERN = re.compile(r"(?:\b(?:https?|ftp)://|\bwww\.)[^\s<>\"'`()\[\]{}|\\^]+", re.IGNORECASE)
+
+# Sentence punctuation right after a link ("see https://x.com/a.") is not
+# part of it.
+_TRAILING = ".,;:!?*"
+
+
+@functools.lru_cache(maxsize=HOST_CACHE_SIZE)
+def normalize_host(host: str) -> str:
+    """Canonical form of a host: lower case, no trailing dot, IDNA (punycode).
+
+    Hosts that are not valid IDNA names (e.g. an empty label) are only
+    lower-cased.
+    """
+    host = host.rstrip(".").lower()
+    if host.isascii() or host.startswith("["):
+        return host
+    try:
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return host
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonical form of one URL: lower-case scheme, normalized host without
+    userinfo or port; the path, query and fragment are kept as-is."""
+    scheme, sep, rest = url.partition("://")
+    if not sep:  # "www." link
+        scheme, rest = "http", url
+    end = len(rest)
+    for delimiter in "/?#":
+        position = rest.find(delimiter, 0, end)
+        if position != -1:
+            end = position
+    authority, tail = rest[:end], rest[end:]
+    host = authority.rpartition("@")[2]
+    if host.startswith("["):  # IPv6 literal
+        host = host[:host.find("]") + 1]
+    else:
+        name, colon, port = host.rpartition(":")
+        if colon and (port.isdigit() or not port):
+            host = name
+    return scheme.lower() + "://" + normalize_host(host) + tail
+
+
+def find_urls(text: str) -> list[str]:
+    """Canonical URLs found in `text`, deduplicated, in order of appearance."""
+    found = {}
+    for match in _URL_PATTERN.finditer(text):
+        url = match.group().rstrip(_TRAILING)
+        if url and not url.endswith("//"):
+            found[canonicalize_url(url)] = None
+    return list(found)
+
+
+def merge_urls(urls, body: str) -> list[str]:
+    """Canonical, deduplicated `urls` followed by the new URLs of `body`."""
+    merged = dict.fromkeys(canonicalize_url(url) for url in urls)
+    merged.update(dict.fromkeys(find_urls(body)))
+    return list(merged)
+
+
+# ---------- Graph node ----------
+
+def extract_urls(state: EmailState) -> dict:
+    """Replace `urls` with the canonical URLs of `urls` and the body."""
+    return {"urls": merge_urls(state.urls, state.body)}
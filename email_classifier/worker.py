@@ -0,0 +1,110 @@
+"""
+Cold-start worker entry point
+=============================
+
+In a short-lived worker most of the latency of the first email is start-up:
+importing the graph modules pulls in langgraph, langchain_core and
+langsmith (about 0.9 s), while compiling a graph takes a few milliseconds
+but is repeated by every `build_*` call. This module is the entry point for
+such workers:
+
+  - importing it is free: langgraph, the graph builders and the classifier
+    modules are only imported on first use;
+  - `get_graph(**options)` compiles each `build_pipeline` variant once per
+    process and returns the same compiled graph on every later call;
+  - `classify(email)` uses the default graph once it is compiled. Until
+    then it answers with `batch.classify_batch`, which returns the same
+    result without importing langgraph, so the first emails never wait
+    for it;
+  - `warm_up()` imports and compiles the default graph in a background
+    thread; call it as soon as the worker starts.
+
+`python -m benchmarks.bench_startup` profiles both start-up paths.
+
+Usage:
+
+    from email_classifier import worker
+
+    worker.warm_up()
+    result = worker.classify(email)               # same dict as graph.invoke
+    graph = worker.get_graph(hitl=True)           # compiled once per process
+"""
+
+import threading
+
+
+_lock = threading.Lock()
+_graphs: dict = {}
+_warm_up_thread: threading.Thread | None = None
+
+
+def _key(options: dict) -> tuple:
+    return tuple(sorted(options.items()))
+
+
+def get_graph(**options):
+    """The compiled `build_pipeline(**options)` graph of this process.
+
+    Options are compared by value (objects such as a RuleStore or a
+    Metrics registry by identity), so they must be hashable. A HITL graph
+    built without a checkpointer keeps its InMemorySaver for the life of
+    the process.
+    """
+    key = _key(options)
+    graph = _graphs.get(key)
+    if graph is not None:
+        return graph
+    with _lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            from email_classifier.pipeline import build_pipeline
+
+            graph = _graphs[key] = build_pipeline(**options)
+    return graph
+
+
+def is_warm(**options) -> bool:
+    """True once `get_graph(**options)` has been compiled."""
+    return _key(options) in _graphs
+
+
+def warm_up(background: bool = True) -> threading.Thread | None:
+    """Import and compile the default graph, in a daemon thread by default.
+
+    Returns:
+        The warm-up thread (None when `background` is False or the graph is
+        already warm).
+    """
+    global _warm_up_thread
+
+    if is_warm():
+        return None
+    if not background:
+        get_graph()
+        return None
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=get_graph, name="graph-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def classify(email: dict) -> dict:
+    """Classify one email with the default graph (same result as
+    `build_pipeline().invoke(email)`), falling back to the batch classifier
+    while the graph is not compiled yet."""
+    graph = _graphs.get(())
+    if graph is not None:
+        return graph.invoke(email)
+    from email_classifier.batch import classify_batch
+
+    return classify_batch([email])[0]
+
+
+def reset() -> None:
+    """Forget the compiled graphs (e.g. after reconfiguring the rules)."""
+    global _warm_up_thread
+
+    with _lock:
+        _graphs.clear()
+        _warm_up_thread = None
@@ -0,0 +1,40 @@
+"""classify_stream scheduling."""
+
+import asyncio
+
+from email_classifier.async_pipeline import classify_stream
+from email_classifier.graph import build_email_classifier
+from email_classifier.mock_data import MOCK_EMAILS
+
+
+def test_stream_classifies_every_email():
+    graph = build_email_classifier()
+
+    async def run():
+        return [item async for item in classify_stream(graph, MOCK_EMAILS, concurrency=2)]
+
+    results = asyncio.run(run())
+    assert sorted(email["email_id"] for email, _ in results) == [e["email_id"] for e in MOCK_EMAILS]
+    assert all("threat_level" in result for _, result in results)
+
+
+def test_results_are_not_held_back_by_a_slow_source():
+    graph = build_email_classifier()
+
+    async def slow_source():
+        yield MOCK_EMAILS[0]
+        await asyncio.sleep(0.5)
+        yield MOCK_EMAILS[1]
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        return [
+            (email["email_id"], loop.time() - start)
+            async for email, _ in classify_stream(graph, slow_source())
+        ]
+
+    [(first, first_at), (second, second_at)] = asyncio.run(run())
+    assert (first, second) == ("email_001", "email_002")
+    assert first_at < 0.25
+    assert second_at >= 0.5
@@ -0,0 +1,58 @@
+"""Host extraction and blocklist lookups on hostile URLs."""
+
+import pytest
+
+from email_classifier.batch import classify_batch
+from email_classifier.blocklist import BlocklistIndex, check_urls_against_blocklist, extract_host
+from email_classifier.graph import build_email_classifier
+from email_classifier.mmap_blocklist import MappedBlocklist, build_compact_blocklist
+from email_classifier.mock_data import URL_BLOCKLIST
+from email_classifier.reclassify import ReclassificationIndex, RuleDelta
+
+# A "//" in the path or query must not move the host.
+REDIRECT_URL = "https://evil-download.org/go?next=https://www.google.com/"
+DOUBLE_SLASH_URL = "https://evil-download.org//double/slash"
+HOSTILE_URLS = [REDIRECT_URL, DOUBLE_SLASH_URL]
+
+
+@pytest.mark.parametrize("url, host", [
+    (REDIRECT_URL, "evil-download.org"),
+    (DOUBLE_SLASH_URL, "evil-download.org"),
+    ("http://User@EVIL-download.org.:8080/x", "evil-download.org"),
+    ("evil-download.org/path?u=http://a.com", "evil-download.org"),
+    ("http://bücher.example.com/", "xn--bcher-kva.example.com"),
+    ("http://[::1", ""),
+])
+def test_extract_host(url, host):
+    assert extract_host(url) == host
+
+
+@pytest.mark.parametrize("url", HOSTILE_URLS)
+def test_hostile_urls_are_flagged(url, tmp_path):
+    assert not check_urls_against_blocklist([url])["safe"]
+    path = str(tmp_path / "blocklist.bin")
+    build_compact_blocklist(URL_BLOCKLIST, path)
+    with MappedBlocklist(path) as mapped:
+        assert mapped.check_urls([url])["flagged_urls"] == [url]
+
+
+@pytest.mark.parametrize("url", HOSTILE_URLS)
+def test_hostile_urls_are_dangerous_in_graph_and_batch(url):
+    email = {"email_id": "e1", "subject": "Hi", "body": "See link", "sender": "a@b.com", "urls": [url]}
+    assert build_email_classifier().invoke(email)["threat_level"] == "dangerous"
+    assert classify_batch([email])[0]["threat_level"] == "dangerous"
+
+
+def test_reclassify_files_hostile_urls_under_their_host():
+    emails = [
+        {"email_id": f"e{i}", "subject": "Hi", "body": "See link", "sender": "a@b.com", "urls": [url]}
+        for i, url in enumerate(HOSTILE_URLS)
+    ]
+    domains = set(URL_BLOCKLIST) - {"evil-download.org"}
+    index = ReclassificationIndex(classify_batch(emails, index=BlocklistIndex(domains)))
+    assert index.emails_for_domain("evil-download.org") == {"e0", "e1"}
+    assert index.emails_for_domain("google.com") == set()
+
+    changes = list(index.apply(RuleDelta(added_domains=frozenset({"evil-download.org"})),
+                               index=BlocklistIndex(URL_BLOCKLIST)))
+    assert [change["threat_level"] for change in changes] == ["dangerous", "dangerous"]
@@ -0,0 +1,163 @@
+"""Contract and durability tests for SqliteCheckpointSaver."""
+
+import gc
+import sqlite3
+import time
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+
+from email_classifier.checkpoint import SqliteCheckpointSaver
+from email_classifier.hitl import build_hitl_graph
+from email_classifier.mock_data import MOCK_EMAILS
+
+
+SAFE_EMAIL = MOCK_EMAILS[0]        # email_001
+SUSPICIOUS_EMAIL = MOCK_EMAILS[2]  # email_003
+
+
+def _config(thread_id: str, checkpoint_id: str | None = None) -> dict:
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ""}
+    if checkpoint_id is not None:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def _committed_threads(path) -> dict[str, str]:
+    """thread_id -> next_nodes as seen by another connection (committed rows only)."""
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT thread_id, next_nodes FROM threads"))
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+
+# ---------- Saver contract ----------
+
+def test_put_get_tuple_list(db_path):
+    with SqliteCheckpointSaver(db_path) as saver:
+        first = empty_checkpoint()
+        first["channel_values"] = {"threat_level": "suspicious"}
+        first["channel_versions"] = {"threat_level": 1}
+        saved = saver.put(_config("t1"), first, {"step": 0}, {"threat_level": 1})
+
+        second = empty_checkpoint()
+        second["channel_values"] = {"threat_level": "safe"}
+        second["channel_versions"] = {"threat_level": 2}
+        saver.put(saved, second, {"step": 1}, {"threat_level": 2})
+
+        latest = saver.get_tuple({"configurable": {"thread_id": "t1"}})
+        assert latest.checkpoint["id"] == second["id"]
+        assert latest.checkpoint["channel_values"] == {"threat_level": "safe"}
+        assert latest.metadata["step"] == 1
+        assert latest.parent_config["configurable"]["checkpoint_id"] == first["id"]
+
+        pinned = saver.get_tuple(_config("t1", first["id"]))
+        assert pinned.checkpoint["channel_values"] == {"threat_level": "suspicious"}
+
+        history = list(saver.list({"configurable": {"thread_id": "t1"}}))
+        assert [item.checkpoint["id"] for item in history] == [second["id"], first["id"]]
+        assert len(list(saver.list(None, filter={"step": 0}))) == 1
+        assert len(list(saver.list(None, limit=1))) == 1
+        assert saver.get_tuple({"configurable": {"thread_id": "unknown"}}) is None
+
+
+def test_put_writes(db_path):
+    with SqliteCheckpointSaver(db_path) as saver:
+        checkpoint = empty_checkpoint()
+        config = saver.put(_config("t1"), checkpoint, {}, {})
+        saver.put_writes(config, [("threat_level", "safe"), ("response", "ok")], task_id="task-1")
+        saver.put_writes(config, [("threat_level", "dangerous")], task_id="task-1")  # redelivery
+
+        pending = saver.get_tuple(config).pending_writes
+        assert pending == [("task-1", "threat_level", "safe"), ("task-1", "response", "ok")]
+
+
+def test_delete_thread(db_path):
+    with SqliteCheckpointSaver(db_path) as saver:
+        saver.put(_config("t1"), empty_checkpoint(), {}, {})
+        saver.delete_thread("t1")
+        assert saver.get_tuple(_config("t1")) is None
+        assert saver.thread_ids() == []
+
+
+def test_thread_ids_matches_any_waiting_node(db_path):
+    with SqliteCheckpointSaver(db_path) as saver:
+        for thread_id, nodes in (("both", ["human_review", "audit"]), ("audit", ["audit"])):
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {f"branch:to:{node}": None for node in nodes}
+            checkpoint["channel_versions"] = {f"branch:to:{node}": 1 for node in nodes}
+            saver.put(_config(thread_id), checkpoint, {}, {})
+        assert _committed_threads(db_path)["both"] == "audit,human_review"
+        assert saver.thread_ids(waiting_on="human_review") == ["both"]
+        assert sorted(saver.thread_ids(waiting_on="audit")) == ["audit", "both"]
+        assert saver.thread_ids(waiting_on="review") == []
+
+
+# ---------- Durability ----------
+
+def test_pause_restart_resume(db_path):
+    # A large batch and no timer: only the commit on park makes the paused
+    # thread visible to another process.
+    saver = SqliteCheckpointSaver(db_path, batch_size=1000, flush_interval=None)
+    graph = build_hitl_graph(checkpointer=saver)
+    graph.invoke(SUSPICIOUS_EMAIL, _config("review-1"))
+    assert _committed_threads(db_path) == {"review-1": "human_review"}
+
+    # "Restart": a new saver on the same file, the old one never closed.
+    with SqliteCheckpointSaver(db_path) as restarted:
+        graph = build_hitl_graph(checkpointer=restarted)
+        config = _config("review-1")
+        assert restarted.thread_ids(waiting_on="human_review") == ["review-1"]
+        assert graph.get_state(config).next == ("human_review",)
+
+        graph.update_state(config, {"threat_level": "safe"})
+        result = graph.invoke(None, config)
+        assert result["response"] == "This email appears safe. No threats detected."
+        assert restarted.thread_ids(waiting_on="human_review") == []
+    saver.close()
+
+
+def test_flush_interval_commits_idle_writes(db_path):
+    saver = SqliteCheckpointSaver(db_path, batch_size=1000, flush_interval=0.05)
+    build_hitl_graph(checkpointer=saver).invoke(SAFE_EMAIL, _config("t1"))
+    deadline = time.monotonic() + 5
+    while "t1" not in _committed_threads(db_path) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert _committed_threads(db_path) == {"t1": ""}
+    saver.close()
+
+
+def test_garbage_collected_saver_commits(db_path):
+    saver = SqliteCheckpointSaver(db_path, batch_size=1000, flush_interval=None)
+    build_hitl_graph(checkpointer=saver).invoke(SAFE_EMAIL, _config("t1"))
+    assert _committed_threads(db_path) == {}
+
+    del saver
+    gc.collect()
+    assert _committed_threads(db_path) == {"t1": ""}
+
+
+# ---------- Compaction ----------
+
+def test_compact_keeps_final_checkpoint(db_path):
+    with SqliteCheckpointSaver(db_path) as saver:
+        graph = build_hitl_graph(checkpointer=saver)
+        graph.invoke(SAFE_EMAIL, _config("done"))
+        graph.invoke(SUSPICIOUS_EMAIL, _config("paused"))
+        before = graph.get_state(_config("done")).values
+        paused_history = len(list(saver.list({"configurable": {"thread_id": "paused"}})))
+
+        assert saver.compact() == 1
+        assert len(list(saver.list({"configurable": {"thread_id": "done"}}))) == 1
+        assert graph.get_state(_config("done")).values == before
+        assert len(list(saver.list({"configurable": {"thread_id": "paused"}}))) == paused_history
+
+        assert saver.compact(delete_completed=True) == 1
+        assert saver.get_tuple(_config("done")) is None
+        assert saver.thread_ids() == ["paused"]
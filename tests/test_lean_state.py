@@ -0,0 +1,75 @@
+"""Body store lifetime with the LeanEmailState schema."""
+
+import pytest
+
+from email_classifier.lean_state import (
+    BodyStore,
+    LeanEmailState,
+    default_body_store,
+    lean_input,
+    release_thread,
+    set_default_body_store,
+)
+from email_classifier.mock_data import MOCK_EMAILS
+from email_classifier.pipeline import build_pipeline
+
+
+@pytest.fixture
+def store():
+    previous = default_body_store()
+    store = BodyStore()
+    set_default_body_store(store)
+    yield store
+    set_default_body_store(previous)
+
+
+def test_release_is_reference_counted():
+    store = BodyStore()
+    ref = store.put("same body")
+    assert store.put("same body") == ref
+    store.release(ref)
+    assert store.get(ref) == "same body"
+    store.release(ref)
+    assert len(store) == 0
+    with pytest.raises(KeyError):
+        store.get(ref)
+
+
+def test_completed_runs_release_their_bodies(store):
+    graph = build_pipeline(state_schema=LeanEmailState)
+    for email in MOCK_EMAILS * 3:
+        graph.invoke(lean_input(email))
+    assert len(store) == 0
+
+
+def test_paused_threads_keep_their_body_until_resumed(store):
+    graph = build_pipeline(hitl=True, state_schema=LeanEmailState)
+    for i, email in enumerate(MOCK_EMAILS):
+        graph.invoke(lean_input(email), {"configurable": {"thread_id": str(i)}})
+    assert len(store) == 1  # email_003 waits on human_review
+
+    config = {"configurable": {"thread_id": "2"}}
+    graph.update_state(config, {"threat_level": "safe"})
+    graph.invoke(None, config)
+    assert len(store) == 0
+
+
+def test_failed_runs_release_their_bodies(store, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("blocklist unavailable")
+
+    monkeypatch.setattr("email_classifier.nodes.check_urls_against_blocklist", broken)
+    graph = build_pipeline(state_schema=LeanEmailState)
+    with pytest.raises(RuntimeError):
+        graph.invoke(lean_input(MOCK_EMAILS[0]))
+    assert len(store) == 0
+
+
+def test_abandoned_threads_release_their_body(store):
+    graph = build_pipeline(hitl=True, state_schema=LeanEmailState)
+    config = {"configurable": {"thread_id": "t1"}}
+    graph.invoke(lean_input(MOCK_EMAILS[2]), config)
+    assert len(store) == 1
+
+    release_thread(graph, config)
+    assert len(store) == 0
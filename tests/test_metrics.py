@@ -0,0 +1,52 @@
+"""Metrics recorded by the instrumented HITL graph."""
+
+import pytest
+
+from email_classifier.graph import build_email_classifier
+from email_classifier.hitl import build_hitl_graph
+from email_classifier.metrics import Metrics
+from email_classifier.mock_data import MOCK_EMAILS
+from email_classifier.pipeline import build_pipeline
+
+SUSPICIOUS_EMAIL = MOCK_EMAILS[2]  # email_003
+
+
+@pytest.mark.parametrize("verdict", ["safe", "dangerous", "suspicious", None])
+def test_review_wait_is_recorded_for_every_verdict(verdict):
+    metrics = Metrics()
+    graph = build_pipeline(hitl=True, metrics=metrics)
+    config = {"configurable": {"thread_id": "t1"}}
+    graph.invoke(SUSPICIOUS_EMAIL, config)
+    assert metrics.to_dict()["reviews_pending"] == 1
+
+    if verdict is not None:
+        graph.update_state(config, {"threat_level": verdict})
+    graph.invoke(None, config)
+
+    data = metrics.to_dict()
+    assert data["review_wait_seconds"]["count"] == 1
+    assert data["reviews_pending"] == 0
+
+
+def test_unpaused_threads_record_no_wait():
+    metrics = Metrics()
+    graph = build_pipeline(hitl=True, metrics=metrics)
+    for email in (MOCK_EMAILS[0], MOCK_EMAILS[1]):
+        graph.invoke(email, {"configurable": {"thread_id": email["email_id"]}})
+    assert metrics.to_dict()["review_wait_seconds"]["count"] == 0
+
+
+def test_text_scanned_is_counted_in_utf8_bytes():
+    metrics = Metrics()
+    graph = build_pipeline(metrics=metrics)
+    graph.invoke({**MOCK_EMAILS[0], "subject": "Café", "body": "naïve — ok"})
+    assert metrics.to_dict()["text_bytes_scanned"] == len("Café".encode()) + len("naïve — ok".encode())
+    assert "email_classifier_text_bytes_scanned_total 18" in metrics.to_prometheus()
+
+
+@pytest.mark.parametrize("build", [build_email_classifier, build_hitl_graph])
+def test_tutorial_builders_accept_metrics(build):
+    metrics = Metrics()
+    graph = build(metrics=metrics)
+    graph.invoke(MOCK_EMAILS[0], {"configurable": {"thread_id": "t1"}})
+    assert set(metrics.to_dict()["nodes"]) == {"check_urls", "analyze_content", "generate_response"}
@@ -0,0 +1,41 @@
+"""Incremental re-classification against a full batch run."""
+
+import pytest
+
+from email_classifier.batch import classify_batch
+from email_classifier.keywords import KeywordAutomaton
+from email_classifier.mock_data import MOCK_EMAILS, SPAM_KEYWORDS
+from email_classifier.reclassify import ReclassificationIndex, RuleDelta
+
+EMAILS = [dict(email, email_id=f"{email['email_id']}-{i}") for i in range(3) for email in MOCK_EMAILS]
+
+
+def _reclassified(old_keywords, new_keywords):
+    index = ReclassificationIndex(classify_batch(EMAILS, automaton=KeywordAutomaton(old_keywords)))
+    delta = RuleDelta.between(old_keywords=old_keywords, new_keywords=new_keywords)
+    list(index.apply(delta, keywords=new_keywords))
+    return delta, list(index.results())
+
+
+def test_duplicate_keyword_is_a_change():
+    delta = RuleDelta.between(old_keywords=["urgent", "act now"], new_keywords=["urgent", "act now", "urgent"])
+    assert delta.added_keywords == () and delta.removed_keywords == ()
+    assert delta.rescan_keywords and delta.keywords_changed
+    assert not RuleDelta.between(old_keywords=["a", "b"], new_keywords=["b", "a"]).keywords_changed
+
+
+@pytest.mark.parametrize("new_keywords", [
+    SPAM_KEYWORDS + ["urgent"] * 3,          # duplicates added
+    SPAM_KEYWORDS + ["meeting"],             # new keyword
+    [kw for kw in SPAM_KEYWORDS if kw != "urgent"],
+])
+def test_apply_matches_a_full_run(new_keywords):
+    delta, results = _reclassified(list(SPAM_KEYWORDS), list(new_keywords))
+    assert delta.keywords_changed
+    assert results == classify_batch(EMAILS, automaton=KeywordAutomaton(new_keywords))
+
+
+def test_removing_duplicates_matches_a_full_run():
+    old_keywords = SPAM_KEYWORDS + ["urgent"] * 3
+    _, results = _reclassified(old_keywords, list(SPAM_KEYWORDS))
+    assert results == classify_batch(EMAILS, automaton=KeywordAutomaton(SPAM_KEYWORDS))
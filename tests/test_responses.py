@@ -0,0 +1,17 @@
+"""Lazy response templates."""
+
+import pytest
+
+from email_classifier.nodes import RESPONSES, generate_response
+from email_classifier.responses import DEFAULT_TEMPLATES, default_templates
+from email_classifier.state import EmailState
+
+
+@pytest.mark.parametrize("threat_level", [*RESPONSES, "unknown"])
+def test_default_templates_match_generate_response(threat_level):
+    expected = generate_response(EmailState(threat_level=threat_level))["response"]
+    assert default_templates().render({"threat_level": threat_level}) == expected
+
+
+def test_default_templates_follow_responses():
+    assert DEFAULT_TEMPLATES == RESPONSES
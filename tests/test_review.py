@@ -0,0 +1,45 @@
+"""ReviewQueue bulk resume."""
+
+import asyncio
+
+import pytest
+
+from email_classifier.mock_data import MOCK_EMAILS
+from email_classifier.pipeline import build_pipeline
+from email_classifier.review import ReviewQueue
+
+SUSPICIOUS_EMAIL = MOCK_EMAILS[2]  # email_003
+
+
+@pytest.mark.parametrize("lazy_responses", [False, True])
+def test_resume_reports_rendered_response(lazy_responses):
+    queue = ReviewQueue(build_pipeline(hitl=True, lazy_responses=lazy_responses))
+    queue.submit(SUSPICIOUS_EMAIL, "t1")
+    assert queue.pending() == ["t1"]
+
+    [outcome] = queue.resume({"t1": "dangerous"})
+    assert outcome.ok
+    assert outcome.threat_level == "dangerous"
+    assert outcome.response == "ALERT: This email is dangerous. Do not interact with it."
+    assert queue.pending() == []
+
+
+def test_resume_reports_per_thread_errors():
+    queue = ReviewQueue(build_pipeline(hitl=True))
+    queue.submit(SUSPICIOUS_EMAIL, "t1")
+    outcomes = queue.resume({"t1": "unknown", "missing": None})
+    assert [outcome.ok for outcome in outcomes] == [False, False]
+    assert outcomes[0].error.startswith("ValueError")
+    assert outcomes[1].error.startswith("LookupError")
+
+
+def test_resume_inside_a_running_event_loop():
+    queue = ReviewQueue(build_pipeline(hitl=True))
+    queue.submit(SUSPICIOUS_EMAIL, "t1")
+
+    async def notebook_cell():
+        return queue.resume({"t1": "safe"})
+
+    [outcome] = asyncio.run(notebook_cell())
+    assert outcome.ok
+    assert outcome.threat_level == "safe"
@@ -0,0 +1,27 @@
+"""Rules directories written by write_rules."""
+
+from email_classifier.blocklist import BlocklistIndex
+from email_classifier.mmap_blocklist import MappedBlocklist
+from email_classifier.mock_data import URL_BLOCKLIST
+from email_classifier.rules import load_rules, write_rules
+
+HOSTS = ["malware-site.com", "a.b.phishing-page.net", "example.com", "site.com", ""]
+
+
+def test_compact_rules_are_mapped(tmp_path):
+    write_rules(str(tmp_path), compact=True)
+    ruleset = load_rules(str(tmp_path))
+    assert isinstance(ruleset.index, MappedBlocklist)
+    assert [ruleset.index.is_blocked(h) for h in HOSTS] == [
+        BlocklistIndex(URL_BLOCKLIST).is_blocked(h) for h in HOSTS
+    ]
+    ruleset.index.close()
+
+
+def test_text_rules_replace_a_stale_compact_table(tmp_path):
+    write_rules(str(tmp_path), compact=True)
+    write_rules(str(tmp_path), blocklist={"other.org"})
+    ruleset = load_rules(str(tmp_path))
+    assert isinstance(ruleset.index, BlocklistIndex)
+    assert ruleset.index.is_blocked("x.other.org")
+    assert not ruleset.index.is_blocked("malware-site.com")
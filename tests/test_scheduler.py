@@ -0,0 +1,53 @@
+"""ReviewScheduler intake and ordering."""
+
+import pytest
+
+from email_classifier.mock_data import MOCK_EMAILS
+from email_classifier.pipeline import build_pipeline
+from email_classifier.review import ReviewQueue
+from email_classifier.scheduler import IndexedPriorityQueue, ReviewScheduler
+
+
+@pytest.mark.parametrize("lazy_responses", [False, True])
+def test_submit_queues_only_paused_threads(lazy_responses):
+    graph = build_pipeline(hitl=True, lazy_responses=lazy_responses)
+    scheduler = ReviewScheduler(ReviewQueue(graph))
+    for email in MOCK_EMAILS:
+        scheduler.submit(email, email["email_id"])
+    assert len(scheduler) == 1
+    assert scheduler.peek().thread_id == "email_003"
+
+
+def test_indexed_priority_queue_updates_and_removes():
+    queue = IndexedPriorityQueue()
+    for key, priority in (("a", 3.0), ("b", 1.0), ("c", 2.0)):
+        queue.push(key, priority)
+    queue.push("a", 0.5)
+    queue.remove("c")
+    assert [queue.pop() for _ in range(len(queue))] == [("a", 0.5), ("b", 1.0)]
+
+
+def test_failed_resume_keeps_the_item_queued():
+    scheduler = ReviewScheduler(ReviewQueue(build_pipeline(hitl=True)))
+    scheduler.submit(MOCK_EMAILS[2], "t1")
+
+    outcome = scheduler.decide("t1", "unknown")
+    assert not outcome.ok
+    assert len(scheduler) == 1 and scheduler.peek().thread_id == "t1"
+
+    assert scheduler.decide("t1", "safe").ok
+    assert len(scheduler) == 0
+
+
+def test_failed_sla_release_keeps_the_item_queued():
+    scheduler = ReviewScheduler(ReviewQueue(build_pipeline(hitl=True)), sla_seconds=0, default_verdict="unknown")
+    scheduler.submit(MOCK_EMAILS[2], "t1")
+
+    [outcome] = scheduler.release_expired()
+    assert not outcome.ok
+    assert len(scheduler) == 1
+
+    scheduler.default_verdict = "suspicious"
+    [outcome] = scheduler.release_expired()
+    assert outcome.ok
+    assert len(scheduler) == 0